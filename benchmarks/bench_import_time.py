@@ -0,0 +1,59 @@
+"""Check the start-up cost of the command line entry point against a budget.
+
+Runs ``python -X importtime -m serial_comm --help`` in fresh interpreters and reports the cumulative import
+time of the ``serial_comm`` package and the wall time of the whole process. Exits with status 1 if the
+best run exceeds the budget or if wx got imported.
+
+Usage: python -m benchmarks.bench_import_time [--budget-ms 50]
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+import time
+
+IMPORT_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def measure() -> tuple[float, float, bool]:
+    """Return (serial_comm import ms, process wall ms, whether wx was imported) of one CLI start."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "serial_comm", "--help"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    package_us = 0
+    wx_imported = False
+    for line in result.stderr.splitlines():
+        if match := IMPORT_LINE.match(line):
+            cumulative, indent, module = match.groups()
+            if module == "serial_comm" and len(indent) == 1:
+                package_us = int(cumulative)
+            wx_imported |= module == "wx" or module.startswith("wx.")
+    return package_us / 1000, wall_ms, wx_imported
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="serial_comm import time budget")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    import_ms = min(run[0] for run in runs)
+    wall_ms = min(run[1] for run in runs)
+    wx_imported = any(run[2] for run in runs)
+    print(f"serial_comm import: {import_ms:.1f} ms (budget {args.budget_ms:g} ms)")
+    print(f"CLI process wall time: {wall_ms:.1f} ms")
+    if wx_imported:
+        print("FAIL: the CLI imported wx")
+    if import_ms > args.budget_ms or wx_imported:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
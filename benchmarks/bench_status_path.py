@@ -0,0 +1,60 @@
+"""Micro-benchmark of the per-poll status parsing and command encoding overhead.
+
+Compares the original string based handling (decode, replace, split and index, encode on every send)
+with ``parse_status_frame`` and the precomputed command bytes. The ``moving`` case parses a new line every
+time, as while the stepper moves, the others repeat one line as a resting device does.
+
+Usage: python -m benchmarks.bench_status_path [--number N]
+"""
+
+import argparse
+import itertools
+import timeit
+
+from serial_comm.protocol import Command, encode_command, parse_status_frame
+
+RAW_LINE = b"STST,435,1200,0,0,1\r\n"
+# what FrameReader hands out, a slice of its receive buffer without the terminator
+FRAME_VIEW = memoryview(bytearray(RAW_LINE))[:-2]
+# a moving stepper, more distinct lines than the parser caches, so every parse misses the cache
+MOVING_LINES = itertools.cycle([f"STST,435,{position},0,1,1\r\n".encode() for position in range(1024)])
+
+
+def legacy_parse(line: bytes) -> tuple:
+    message = line.decode("UTF-8").replace("\r\n", "")
+    status_message_list = message.split(",")
+    frequency = status_message_list[1]
+    return (
+        int(frequency) if frequency.isnumeric() else None,
+        status_message_list[3] != "0",
+        status_message_list[5] != "0",
+    )
+
+
+def legacy_encode(command: Command, parameter: str = "") -> bytes:
+    command_string = command.value + parameter + "\n"
+    return command_string.encode("UTF-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200_000, help="iterations per measurement")
+    args = parser.parse_args()
+
+    cases = {
+        "parse legacy": lambda: legacy_parse(RAW_LINE),
+        "parse StatusFrame": lambda: parse_status_frame(RAW_LINE),
+        "parse StatusFrame view": lambda: parse_status_frame(FRAME_VIEW),
+        "parse StatusFrame moving": lambda: parse_status_frame(next(MOVING_LINES)),
+        "encode legacy ST?": lambda: legacy_encode(Command.GET_STATUS),
+        "encode cached ST?": lambda: encode_command(Command.GET_STATUS),
+        "encode legacy ST-10": lambda: legacy_encode(Command.FILTER_STEP_UP, "10"),
+        "encode cached ST-10": lambda: encode_command(Command.FILTER_STEP_UP, "10"),
+    }
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=args.number, repeat=5))
+        print(f"{name:<24} {best / args.number * 1e9:8.1f} ns/op")
+
+
+if __name__ == "__main__":
+    main()
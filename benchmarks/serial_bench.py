@@ -0,0 +1,151 @@
+"""Benchmark suite of the serial path, run against local ``VirtualDevice`` instances.
+
+Measures status round-trip latency percentiles, maximum command throughput, the cost of a lost reply
+(reply timeout), ``get_com_ports`` discovery time for a growing number of ports and the parse cost per
+status frame. Results are written as JSON so they can be compared between releases.
+
+Usage: python -m benchmarks.serial_bench [--output results.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import time
+import timeit
+from contextlib import ExitStack
+
+from serial.tools import list_ports
+
+from serial_comm import BadSerialResponseException, SerialCommander, SerialManager
+from serial_comm.protocol import Command, parse_status_frame
+from serial_comm.virtual_device import VirtualDevice
+
+
+def percentiles(samples: list[float]) -> dict:
+    """Return p50/p95/p99, mean and max of latency samples given in seconds, in milliseconds."""
+    cut_points = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "count": len(samples),
+        "p50_ms": cut_points[49] * 1000,
+        "p95_ms": cut_points[94] * 1000,
+        "p99_ms": cut_points[98] * 1000,
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+def bench_round_trip(count: int, latency: float) -> dict:
+    with VirtualDevice(latency=latency) as device:
+        serial_commander = SerialCommander(device.port)
+        serial_commander.get_status()  # open the port outside of the measurement
+        samples = []
+        for _ in range(count):
+            start = time.perf_counter()
+            serial_commander.get_status()
+            samples.append(time.perf_counter() - start)
+        serial_commander.close()
+    return {"device_latency_ms": latency * 1000, **percentiles(samples)}
+
+
+def bench_throughput(count: int) -> dict:
+    with VirtualDevice() as device:
+        serial_manager = SerialManager(device.port)
+        start = time.perf_counter()
+        for _ in range(count):
+            serial_manager._send_command(Command.FILTER_STEP_UP, "1")
+        send_time = time.perf_counter() - start
+        # wait until the device has seen every command
+        while device.received_lines < count and time.perf_counter() - start < 30:
+            time.sleep(0.001)
+        total_time = time.perf_counter() - start
+        serial_manager.close()
+    return {
+        "commands": count,
+        "received": device.received_lines,
+        "send_commands_per_s": count / send_time,
+        "delivered_commands_per_s": device.received_lines / total_time,
+    }
+
+
+def bench_timeout(count: int) -> dict:
+    with VirtualDevice(drop_rate=1.0) as device:
+        serial_commander = SerialCommander(device.port)
+        samples = []
+        for _ in range(count):
+            start = time.perf_counter()
+            try:
+                serial_commander.get_status()
+            except BadSerialResponseException:
+                pass
+            samples.append(time.perf_counter() - start)
+        serial_commander.close()
+    return {"count": count, "mean_ms": statistics.fmean(samples) * 1000, "max_ms": max(samples) * 1000}
+
+
+def bench_discovery(port_counts: list[int], timeout: float) -> list[dict]:
+    results = []
+    previous_extra_ports = os.environ.get("GS_EXTRA_PORTS")
+    # only the virtual ports are probed, real host ports (e.g. /dev/ttyS0) would run into the deadline
+    host_comports = list_ports.comports
+    list_ports.comports = list
+    try:
+        for port_count in port_counts:
+            with ExitStack() as stack:
+                devices = [stack.enter_context(VirtualDevice()) for _ in range(port_count)]
+                os.environ["GS_EXTRA_PORTS"] = os.pathsep.join(device.port for device in devices)
+                start = time.perf_counter()
+                ports = SerialManager.get_com_ports(timeout)
+                elapsed = time.perf_counter() - start
+            results.append({"virtual_ports": port_count, "listed_ports": len(ports), "seconds": elapsed})
+    finally:
+        list_ports.comports = host_comports
+        if previous_extra_ports is None:
+            os.environ.pop("GS_EXTRA_PORTS", None)
+        else:
+            os.environ["GS_EXTRA_PORTS"] = previous_extra_ports
+    return results
+
+
+def bench_parse(number: int) -> dict:
+    line = VirtualDevice().status_line().rstrip(b"\r\n")
+    best = min(timeit.repeat(lambda: parse_status_frame(line), number=number, repeat=5))
+    return {"ns_per_frame": best / number * 1e9}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serial path benchmark suite")
+    parser.add_argument("--round-trips", type=int, default=1000, help="number of get_status round trips")
+    parser.add_argument("--device-latency", type=float, default=0.0, help="simulated reply latency in seconds")
+    parser.add_argument("--commands", type=int, default=5000, help="number of commands for the throughput test")
+    parser.add_argument("--timeouts", type=int, default=1, help="number of lost replies to time, 0 to skip")
+    parser.add_argument("--ports", default="1,2,4,8,16", help="comma separated virtual port counts for discovery")
+    parser.add_argument("--discovery-timeout", type=float, default=1.0, help="get_com_ports deadline in seconds")
+    parser.add_argument("--parse-number", type=int, default=100_000, help="iterations of the parse benchmark")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    # the timeout benchmark provokes error logs on purpose
+    logging.disable(logging.ERROR)
+    results = {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "round_trip": bench_round_trip(args.round_trips, args.device_latency),
+        "throughput": bench_throughput(args.commands),
+        "timeout": bench_timeout(args.timeouts) if args.timeouts > 0 else None,
+        "discovery": bench_discovery([int(count) for count in args.ports.split(",")], args.discovery_timeout),
+        "parse": bench_parse(args.parse_number),
+    }
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="UTF-8") as output_file:
+            output_file.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""Long-run soak test of the serial path against a local ``VirtualDevice`` with injected faults.
+
+Polls the device at an accelerated rate for ``--duration`` seconds while sending random commands,
+reconnecting every ``--reconnect-every`` seconds and running ``get_com_ports`` every ``--discovery-every``
+seconds. Every ``--sample-every`` seconds the RSS, open file descriptors, thread count, pubsub listeners and
+the status round-trip percentiles of the last interval are sampled. After a warm-up the growth of each
+resource and the drift of the p95 latency are compared against limits and reported as pass/fail, the exit
+code is 1 if any check failed. The calibration, metrics and port cache files are redirected to a temporary
+directory, the run never touches the files of the station.
+
+With ``--gui`` a hidden ``MainWindow`` is driven instead of a bare ``SerialCommander`` (needs wx and a
+display, e.g. ``xvfb-run``); latencies then come from the window's ``SerialMetrics`` histogram.
+
+Usage: python -m benchmarks.soak [--duration 7200] [--output soak.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from serial import SerialException
+
+from serial_comm import BadSerialResponseException, SerialCommander, SerialManager, serial_comm
+from serial_comm.metrics import LATENCY_BUCKETS
+from serial_comm.protocol import Command
+from serial_comm.virtual_device import VirtualDevice
+
+COMMANDS = ("set_bypass_on", "set_bypass_off", "set_mode_tx_on", "set_mode_tx_off", "filter_step_up_1")
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", encoding="UTF-8") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        # peak instead of current RSS, still shows growth
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def open_fds() -> int:
+    for directory in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(directory))
+        except OSError:
+            continue
+    return -1
+
+
+def pubsub_listeners() -> int:
+    try:
+        from pubsub import pub
+    except ImportError:
+        return 0
+    count = 0
+    topics = [pub.getDefaultTopicTreeRoot()]
+    while topics:
+        topic = topics.pop()
+        count += len(topic.getListeners())
+        topics.extend(topic.getSubtopics())
+    return count
+
+
+def percentiles(samples: list[float]) -> dict:
+    if len(samples) < 2:
+        value = samples[0] * 1000 if samples else None
+        return {"count": len(samples), "p50_ms": value, "p95_ms": value, "p99_ms": value}
+    cut_points = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "count": len(samples),
+        "p50_ms": cut_points[49] * 1000,
+        "p95_ms": cut_points[94] * 1000,
+        "p99_ms": cut_points[98] * 1000,
+    }
+
+
+def histogram_percentiles(counts: list[int]) -> dict:
+    """Percentiles of a window of ``Histogram`` bucket counts, as bucket upper bounds."""
+    total = sum(counts)
+    result = {"count": total}
+    for name, q in (("p50_ms", 0.5), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+        value = None
+        cumulative = 0
+        for bound, count in zip([*LATENCY_BUCKETS, float("inf")], counts):
+            cumulative += count
+            if total and cumulative >= q * total:
+                value = bound * 1000
+                break
+        result[name] = value
+    return result
+
+
+def take_sample(start: float, latency: dict, counters: dict) -> dict:
+    return {
+        "seconds": time.monotonic() - start,
+        "rss_bytes": rss_bytes(),
+        "open_fds": open_fds(),
+        "threads": threading.active_count(),
+        "pubsub_listeners": pubsub_listeners(),
+        **{f"latency_{key}": value for key, value in latency.items()},
+        **counters,
+    }
+
+
+def soak_commander(args: argparse.Namespace, device: VirtualDevice) -> list[dict]:
+    rng = random.Random(args.seed)
+    counters = {"polls": 0, "commands": 0, "timeouts": 0, "bad_responses": 0, "serial_errors": 0, "reconnects": 0}
+    samples = []
+    start = time.monotonic()
+    deadline = start + args.duration
+    next_sample = start + args.sample_every
+    next_reconnect = start + args.reconnect_every
+    next_discovery = start + args.discovery_every
+    round_trips: list[float] = []
+    serial_commander = SerialCommander(device.port, coalesce=True, reply_timeout=args.reply_timeout)
+    try:
+        while (now := time.monotonic()) < deadline:
+            if now >= next_reconnect:
+                serial_commander.close()
+                serial_commander = SerialCommander(device.port, coalesce=True, reply_timeout=args.reply_timeout)
+                counters["reconnects"] += 1
+                next_reconnect = now + args.reconnect_every
+            if now >= next_discovery:
+                SerialManager.get_com_ports(args.discovery_timeout)
+                next_discovery = now + args.discovery_every
+            if rng.random() < args.command_rate:
+                getattr(serial_commander, rng.choice(COMMANDS))()
+                counters["commands"] += 1
+            started = time.perf_counter()
+            try:
+                serial_commander.get_status()
+                round_trips.append(time.perf_counter() - started)
+            except BadSerialResponseException as ex:
+                counters["timeouts" if str(ex).startswith("No reply") else "bad_responses"] += 1
+            except SerialException:
+                counters["serial_errors"] += 1
+                serial_commander.close()
+            counters["polls"] += 1
+            if time.monotonic() >= next_sample:
+                samples.append(take_sample(start, percentiles(round_trips), counters))
+                round_trips = []
+                next_sample += args.sample_every
+            time.sleep(args.poll_interval)
+    finally:
+        serial_commander.close()
+    return samples
+
+
+def soak_gui(args: argparse.Namespace, device: VirtualDevice, state_dir: str) -> list[dict]:
+    # the window learns a calibration of the simulated device and writes metrics, none of it may replace the
+    # files of the station; read when wxUI.main_window is imported
+    os.environ["GS_CALIBRATION_FILE"] = os.path.join(state_dir, "calibration.json")
+    os.environ["GS_METRICS_FILE"] = os.path.join(state_dir, "metrics.prom")
+    # accelerated polling, read by the PollScheduler of the MainWindow
+    os.environ.setdefault("GS_POLL_INTERVAL_MS", str(args.poll_interval * 1000))
+    os.environ.setdefault("GS_POLL_IDLE_MS", str(args.poll_interval * 1000))
+    os.environ.setdefault("GS_POLL_FAST_MS", str(args.poll_interval * 1000))
+    os.environ.setdefault("GS_TELEMETRY_DIR", "")
+    import wx
+
+    from wxUI.main_window import MainWindow
+
+    app = wx.App(False)
+    frame = MainWindow(None, "GS controller soak")
+    frame.StartSerialWorker(device.port)
+    rng = random.Random(args.seed)
+    samples = []
+    start = time.monotonic()
+    state = {"previous": None, "next_reconnect": start + args.reconnect_every, "reconnects": 0}
+
+    def on_sample() -> None:
+        now = time.monotonic()
+        counts = list(frame.serialMetrics.latency[("read", Command.GET_STATUS)].counts)
+        previous = state["previous"] if state["previous"] is not None else [0] * len(counts)
+        window = [c - p for c, p in zip(counts, previous)]
+        state["previous"] = counts
+        samples.append(take_sample(start, histogram_percentiles(window), {"reconnects": state["reconnects"]}))
+        if now >= state["next_reconnect"]:
+            frame.StartSerialWorker(device.port)
+            state["reconnects"] += 1
+            state["next_reconnect"] = now + args.reconnect_every
+        if now - start >= args.duration:
+            frame.Close()
+
+    def on_command() -> None:
+        if frame.serialWorker is not None and rng.random() < args.command_rate:
+            frame.SubmitCommand(rng.choice(COMMANDS))
+
+    sampleTimer = wx.Timer(frame)
+    frame.Bind(wx.EVT_TIMER, lambda event: on_sample(), sampleTimer)
+    sampleTimer.Start(round(args.sample_every * 1000))
+    commandTimer = wx.Timer(frame)
+    frame.Bind(wx.EVT_TIMER, lambda event: on_command(), commandTimer)
+    commandTimer.Start(100)
+    app.MainLoop()
+    return samples
+
+
+def _growth(samples: list[dict], key: str) -> float:
+    """Median of the last fifth of the samples minus the median of the first fifth.
+
+    Medians ignore short-lived spikes, e.g. the probe threads and ports of a running ``get_com_ports``.
+    """
+    fifth = max(1, len(samples) // 5)
+    return statistics.median(s[key] for s in samples[-fifth:]) - statistics.median(s[key] for s in samples[:fifth])
+
+
+def analyse(samples: list[dict], args: argparse.Namespace) -> list[dict]:
+    steady = [sample for sample in samples if sample["seconds"] >= args.warmup]
+    if len(steady) < 4:
+        return [{"check": "samples", "value": len(steady), "limit": 4, "passed": False}]
+    with_latency = [sample for sample in steady if sample["latency_p95_ms"] is not None]
+    latency_drift = _growth(with_latency, "latency_p95_ms") if with_latency else float("nan")
+    checks = [
+        ("rss_growth_mb", _growth(steady, "rss_bytes") / 2**20, args.max_rss_growth_mb),
+        ("open_fds_growth", _growth(steady, "open_fds"), args.max_fd_growth),
+        ("threads_growth", _growth(steady, "threads"), args.max_thread_growth),
+        ("pubsub_listeners_growth", _growth(steady, "pubsub_listeners"), 0),
+        ("latency_p95_drift_ms", latency_drift, args.max_latency_drift_ms),
+    ]
+    # NaN (no latency data) fails the check
+    return [{"check": name, "value": value, "limit": limit, "passed": value <= limit} for name, value, limit in checks]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Long-run soak test of the serial path")
+    parser.add_argument("--duration", type=float, default=600, help="test duration in seconds")
+    parser.add_argument("--warmup", type=float, default=30, help="seconds excluded from the drift analysis")
+    parser.add_argument("--sample-every", type=float, default=5, help="resource sampling interval in seconds")
+    parser.add_argument("--poll-interval", type=float, default=0.01, help="delay between status polls in seconds")
+    parser.add_argument("--command-rate", type=float, default=0.1, help="probability of a command before a poll")
+    parser.add_argument("--reconnect-every", type=float, default=60, help="reopen the port every N seconds")
+    parser.add_argument("--discovery-every", type=float, default=120, help="run get_com_ports every N seconds")
+    parser.add_argument("--discovery-timeout", type=float, default=0.5, help="get_com_ports deadline in seconds")
+    parser.add_argument("--reply-timeout", type=float, default=0.1, help="status reply timeout in seconds")
+    parser.add_argument("--device-latency", type=float, default=0.001, help="simulated reply latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.001, help="simulated reply jitter in seconds")
+    parser.add_argument("--drop-rate", type=float, default=0.005, help="probability of a dropped reply")
+    parser.add_argument("--garble-rate", type=float, default=0.005, help="probability of a garbled reply")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-rss-growth-mb", type=float, default=5.0)
+    parser.add_argument("--max-fd-growth", type=int, default=0)
+    parser.add_argument("--max-thread-growth", type=int, default=0)
+    parser.add_argument("--max-latency-drift-ms", type=float, default=1.0)
+    parser.add_argument("--gui", action="store_true", help="drive a hidden MainWindow instead of SerialCommander")
+    parser.add_argument("--output", help="write the samples and the summary as JSON to this file")
+    args = parser.parse_args()
+
+    # the injected faults provoke error logs on purpose
+    logging.disable(logging.ERROR)
+    previous_extra_ports = os.environ.get("GS_EXTRA_PORTS")
+    with VirtualDevice(
+        latency=args.device_latency,
+        jitter=args.jitter,
+        drop_rate=args.drop_rate,
+        garble_rate=args.garble_rate,
+        seed=args.seed,
+    ) as device:
+        # discovery probes the simulated device too
+        os.environ["GS_EXTRA_PORTS"] = device.port
+        state_dir = tempfile.mkdtemp(prefix="gs_soak_")
+        # discovery would remember the simulated device as the station's controller
+        host_port_cache = serial_comm.PORT_CACHE_PATH
+        serial_comm.PORT_CACHE_PATH = os.path.join(state_dir, "ports.json")
+        try:
+            samples = soak_gui(args, device, state_dir) if args.gui else soak_commander(args, device)
+        finally:
+            serial_comm.PORT_CACHE_PATH = host_port_cache
+            shutil.rmtree(state_dir, ignore_errors=True)
+            if previous_extra_ports is None:
+                os.environ.pop("GS_EXTRA_PORTS", None)
+            else:
+                os.environ["GS_EXTRA_PORTS"] = previous_extra_ports
+
+    checks = analyse(samples, args)
+    passed = all(check["passed"] for check in checks)
+    for check in checks:
+        print(
+            f"{'PASS' if check['passed'] else 'FAIL'} {check['check']}: {check['value']:.3f} (limit {check['limit']})"
+        )
+    print("PASSED" if passed else "FAILED")
+    if args.output:
+        with open(args.output, "w", encoding="UTF-8") as output_file:
+            json.dump(
+                {"arguments": vars(args), "passed": passed, "checks": checks, "samples": samples},
+                output_file,
+                indent=2,
+            )
+            output_file.write("\n")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
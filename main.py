@@ -1,7 +1,17 @@
+import sys
+
 import wx
+from serial_comm.log_config import setup_logging
 from wxUI.main_window import MainWindow
 
+setup_logging()
 app = wx.App(False)
-frame = MainWindow(None, "GS Controller")
+if len(sys.argv) > 1:
+    # several controllers given on the command line, e.g. main.py /dev/ttyUSB0 /dev/ttyUSB1
+    from wxUI.device_window import MultiDeviceWindow
+
+    frame = MultiDeviceWindow(None, "GS Controller", sys.argv[1:])
+else:
+    frame = MainWindow(None, "GS Controller")
 frame.Show()
 app.MainLoop()
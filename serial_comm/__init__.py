@@ -1,3 +1,49 @@
+import importlib
+
+from .calibration import CalibrationError, CalibrationTable
+from .metrics import SerialMetrics
+from .poll_scheduler import PollConfig, PollScheduler
+from .protocol import Command, StatusFrame, parse_status_frame
 from .serial_comm import BadSerialResponseException, SerialCommander, SerialManager
+from .telemetry import TelemetryArchive, TelemetryReader, TelemetryRecorder
+
+# imported on first use, they pull in asyncio, selectors and threading machinery that simple scripts never need
+_LAZY_IMPORTS = {
+    "AsyncSerialCommander": ".async_serial_comm",
+    "ConnectionState": ".supervisor",
+    "ConnectionSupervisor": ".supervisor",
+    "DeviceManager": ".device_manager",
+    "PassScheduler": ".pass_scheduler",
+    "parse_pass_plan": ".pass_scheduler",
+    "SerialWorker": ".serial_worker",
+}
+
+__all__ = [
+    "AsyncSerialCommander",
+    "BadSerialResponseException",
+    "CalibrationError",
+    "CalibrationTable",
+    "Command",
+    "ConnectionState",
+    "ConnectionSupervisor",
+    "DeviceManager",
+    "PassScheduler",
+    "PollConfig",
+    "PollScheduler",
+    "SerialCommander",
+    "SerialManager",
+    "SerialMetrics",
+    "SerialWorker",
+    "StatusFrame",
+    "TelemetryArchive",
+    "TelemetryReader",
+    "TelemetryRecorder",
+    "parse_pass_plan",
+    "parse_status_frame",
+]
+
 
-__all__ = ["BadSerialResponseException", "SerialCommander", "SerialManager"]
+def __getattr__(name: str):
+    if name in _LAZY_IMPORTS:
+        return getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
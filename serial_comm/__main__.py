@@ -0,0 +1,165 @@
+"""Command line control of the GS filter controller, without the GUI.
+
+Examples::
+
+    python -m serial_comm ports
+    python -m serial_comm --port /dev/ttyUSB0 status
+    python -m serial_comm bypass on
+    python -m serial_comm step +10
+    python -m serial_comm tx off
+    python -m serial_comm pass plan.txt --aos 2026-10-17T12:00:00+00:00
+
+Without ``--port`` (or ``GS_PORT``) the first controller found by ``SerialManager.get_com_ports`` is used.
+``tune_to`` in a pass plan uses the calibration table of the GUI (``GS_CALIBRATION_FILE`` overrides its path).
+Only the serial layer is imported, never wx.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from datetime import datetime
+
+from serial import SerialException
+
+from . import calibration
+from .calibration import CalibrationError, CalibrationTable
+from .log_config import setup_logging
+from .pass_scheduler import ExecutionRecord, PassScheduler, PlannedCommand, parse_pass_plan
+from .protocol import BadSerialResponseException
+from .serial_comm import SerialCommander, SerialManager
+
+CALIBRATION_PATH = os.environ.get("GS_CALIBRATION_FILE", calibration.CALIBRATION_PATH)
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m serial_comm", description="Control the GS filter controller from the command line"
+    )
+    parser.add_argument("--port", default=os.environ.get("GS_PORT"), help="serial port, defaults to $GS_PORT")
+    parser.add_argument("--baudrate", type=int, default=9600)
+    parser.add_argument("-v", "--verbose", action="store_true", help="log the serial traffic")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("ports", help="list serial ports, controllers first")
+    status_parser = commands.add_parser("status", help="print the device status")
+    status_parser.add_argument("--json", action="store_true", help="print the status as JSON")
+    commands.add_parser("bypass", help="switch the filter bypass").add_argument("state", choices=("on", "off"))
+    commands.add_parser("tx", help="switch the forced TX mode").add_argument("state", choices=("on", "off"))
+    step_parser = commands.add_parser("step", help="move the filter, positive steps increase the frequency")
+    step_parser.add_argument("steps", type=int)
+    commands.add_parser("reset", help="reset the filter stepper")
+    pass_parser = commands.add_parser("pass", help="run a timed pass plan (see parse_pass_plan)")
+    pass_parser.add_argument("plan", help="pass plan file")
+    pass_parser.add_argument("--aos", required=True, type=_parse_time, help="AOS as ISO 8601 time or Unix seconds")
+    pass_parser.add_argument("--report", help="write the planned and actual execution times as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def _parse_time(text: str) -> float:
+    try:
+        return float(text)
+    except ValueError:
+        return datetime.fromisoformat(text).timestamp()
+
+
+def _read_plan(plan_path: str, calibration_table: CalibrationTable) -> list[PlannedCommand]:
+    """Parse a pass plan and check that its ``tune_to`` targets can be computed, before the pass begins."""
+    with open(plan_path, encoding="UTF-8") as plan_file:
+        plan = parse_pass_plan(plan_file.read())
+    for command in plan:
+        if command.operation == "tune_to":
+            try:
+                calibration_table.position_for(*command.args)
+            except CalibrationError as ex:
+                raise CalibrationError(f"Cannot tune to {command.args[0]} MHz at T{command.offset:+g}: {ex}") from ex
+    return plan
+
+
+def _run_pass(
+    serial_commander: SerialCommander, plan: list[PlannedCommand], aos: float, report_path: str | None
+) -> None:
+    # open the port and check the device before the first command is due
+    serial_commander.get_status()
+
+    def report(record: ExecutionRecord) -> None:
+        lateness = "-" if record.lateness is None else f"{record.lateness * 1000:+.1f} ms"
+        print(f"T{record.command.offset:+.3f} {record.command.operation} {lateness} {record.error or 'ok'}")
+
+    scheduler = PassScheduler(serial_commander, plan, aos, on_executed=report)
+    scheduler.start()
+    try:
+        while scheduler.is_alive():
+            scheduler.join(0.5)
+    except KeyboardInterrupt:
+        scheduler.stop()
+    if report_path:
+        with open(report_path, "w", encoding="UTF-8") as report_file:
+            json.dump(
+                [
+                    {
+                        **record.command._asdict(),
+                        "started": record.started,
+                        "finished": record.finished,
+                        "error": record.error,
+                    }
+                    for record in scheduler.records
+                ],
+                report_file,
+                indent=2,
+            )
+
+
+def _find_port() -> str:
+    ports = SerialManager.get_com_ports()
+    if not ports:
+        raise SerialException("Could not find suitable serial ports!")
+    return ports[0]
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    setup_logging(logging.DEBUG if args.verbose else logging.WARNING)
+
+    if args.command == "ports":
+        print("\n".join(SerialManager.get_com_ports()))
+        return 0
+
+    try:
+        calibration_table = None
+        if args.command == "pass":
+            calibration_table = CalibrationTable(CALIBRATION_PATH)
+            plan = _read_plan(args.plan, calibration_table)
+        serial_commander = SerialCommander(args.port or _find_port(), args.baudrate, calibration=calibration_table)
+        try:
+            match args.command:
+                case "status":
+                    frame = serial_commander.get_status()
+                    print(json.dumps(frame._asdict()) if args.json else frame)
+                case "bypass" if args.state == "on":
+                    serial_commander.set_bypass_on()
+                case "bypass":
+                    serial_commander.set_bypass_off()
+                case "tx" if args.state == "on":
+                    serial_commander.set_mode_tx_on()
+                case "tx":
+                    serial_commander.set_mode_tx_off()
+                case "step":
+                    serial_commander.filter_step(args.steps)
+                case "reset":
+                    serial_commander.reset_filter()
+                case "pass":
+                    _run_pass(serial_commander, plan, args.aos, args.report)
+        finally:
+            serial_commander.close()
+            if calibration_table is not None:
+                # keep what the pass observed, as the GUI does on close
+                calibration_table.save()
+    except (SerialException, BadSerialResponseException, CalibrationError, OSError, ValueError) as ex:
+        print(f"Error: {ex}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
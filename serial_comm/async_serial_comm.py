@@ -0,0 +1,309 @@
+import asyncio
+import collections
+import logging
+import math
+import os
+import time
+from typing import Awaitable, Callable
+
+import serial
+
+from .protocol import (
+    STATUS_PREFIX,
+    BadSerialResponseException,
+    Command,
+    FrameReader,
+    StatusFrame,
+    encode_command,
+    parse_status_frame,
+)
+
+logger = logging.getLogger(__name__)
+traffic_logger = logging.getLogger("serial_comm.traffic")
+
+
+class AsyncSerialManager:
+    """Non-blocking serial transport driven by the asyncio event loop.
+
+    The port is opened with ``timeout=0`` and its file descriptor is watched with ``loop.add_reader``.
+    Received bytes are split into lines incrementally; ``STST`` lines are matched in FIFO order to the
+    outstanding ``ST?`` requests, any other line is logged as unsolicited.
+
+    A request that times out after its ``ST?`` was written keeps its place in the FIFO for as long again
+    as its timeout, so its late reply is dropped (counted in ``late_replies``) instead of answering the
+    next request. At most one such abandoned place is kept: during an outage every poll times out, and
+    one dead place per poll would swallow as many real replies once the device answers again. The device
+    may also have lost the reply, then the dropped line was the answer of the next request: a request that
+    was waiting while a late reply was dropped gives up its place when it times out as well, which brings
+    the matching back in step after one more timeout.
+    """
+
+    def __init__(self, port: str, baudrate: int = 9600) -> None:
+        self._port = port
+        self._baudrate = baudrate
+        self._connection: serial.Serial | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._reader = FrameReader()
+        self._write_buffer = bytearray()
+        self._drained = asyncio.Event()
+        self._status_waiters: collections.deque[asyncio.Future] = collections.deque()
+        # waiters that may have lost their reply to an abandoned request
+        self._suspect_waiters: set[asyncio.Future] = set()
+        # abandoned waiter still in the FIFO waiting for its late reply and the loop time it is given up
+        self._abandoned: tuple[asyncio.Future, float] | None = None
+        self.late_replies = 0
+
+    @property
+    def port(self) -> str:
+        return self._port
+
+    def _open_serial(self) -> None:
+        """Lazy initializer of serial connection."""
+        if self._connection is not None and self._connection.is_open:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._connection = serial.Serial(self._port, self._baudrate, timeout=0, write_timeout=0)
+        self._loop.add_reader(self._connection.fileno(), self._on_readable)
+        self._drained.set()
+
+    def close(self) -> None:
+        if self._connection is None or not self._connection.is_open:
+            return
+        self._loop.remove_reader(self._connection.fileno())
+        self._loop.remove_writer(self._connection.fileno())
+        self._connection.close()
+        self._write_buffer.clear()
+        self._reader.clear()
+        self._drained.set()
+        error = serial.SerialException(f"{self._port} closed")
+        self._suspect_waiters.clear()
+        self._abandoned = None
+        while self._status_waiters:
+            waiter = self._status_waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(error)
+
+    def _on_readable(self) -> None:
+        try:
+            data = os.read(self._connection.fileno(), 4096)
+        except BlockingIOError:
+            return
+        except OSError as ex:
+            logger.error("Reading from %s failed: %s", self._port, ex)
+            self.close()
+            return
+        if not data:
+            # the device went away (e.g. USB adapter unplugged)
+            logger.error("%s disconnected", self._port)
+            self.close()
+            return
+        self._reader.feed(data)
+        for frame in self._reader.frames():
+            # waiters resume after the buffer was reused, they get a copy
+            self._dispatch_line(bytes(frame))
+
+    def _dispatch_line(self, line: bytes) -> None:
+        traffic_logger.debug("RECEIVED: %s from %s", line, self._port)
+        if line.startswith(STATUS_PREFIX):
+            while self._status_waiters:
+                waiter = self._status_waiters.popleft()
+                if waiter.cancelled():
+                    self._abandoned = None
+                    self.late_replies += 1
+                    logger.info("Late status reply from %s dropped: %s", self._port, line)
+                    self._suspect_waiters.update(w for w in self._status_waiters if not w.done())
+                    return
+                if not waiter.done():
+                    self._suspect_waiters.discard(waiter)
+                    waiter.set_result(line)
+                    return
+        logger.info("Unsolicited message from %s: %s", self._port, line)
+
+    def _on_writable(self) -> None:
+        try:
+            written = os.write(self._connection.fileno(), self._write_buffer)
+        except BlockingIOError:
+            return
+        except OSError as ex:
+            logger.error("Writing to %s failed: %s", self._port, ex)
+            self.close()
+            return
+        del self._write_buffer[:written]
+        if not self._write_buffer:
+            self._loop.remove_writer(self._connection.fileno())
+            self._drained.set()
+
+    async def _send_command(self, command: Command, parameter: str = "", timeout: float | None = None) -> None:
+        self._open_serial()
+        traffic_logger.debug("SEND: %s%s to %s", command.value, parameter, self._port)
+        if not self._write_buffer:
+            self._loop.add_writer(self._connection.fileno(), self._on_writable)
+        # whole lines are appended at once, so concurrent commands are never interleaved
+        self._write_buffer += encode_command(command, parameter)
+        self._drained.clear()
+        await asyncio.wait_for(self._drained.wait(), timeout)
+
+    def _expire_abandoned(self) -> None:
+        """Give up the place of an abandoned request whose late reply did not come in time."""
+        if self._abandoned is not None and self._loop.time() >= self._abandoned[1]:
+            waiter = self._abandoned[0]
+            self._abandoned = None
+            if waiter in self._status_waiters:
+                self._status_waiters.remove(waiter)
+
+    async def _request_status(self, timeout: float | None = None) -> bytes:
+        self._open_serial()
+        self._expire_abandoned()
+        waiter = self._loop.create_future()
+        self._status_waiters.append(waiter)
+        sent = False
+
+        async def exchange() -> bytes:
+            nonlocal sent
+            # the line is queued before the first await, so it is on its way once this runs
+            sent = True
+            await self._send_command(Command.GET_STATUS)
+            return await waiter
+
+        try:
+            return await asyncio.wait_for(exchange(), timeout)
+        finally:
+            # cancelling exchange() usually cancelled the waiter already
+            if not waiter.done():
+                waiter.cancel()
+            if waiter.cancelled() and waiter in self._status_waiters:
+                self._expire_abandoned()
+                # an abandoned waiter keeps its slot to swallow the late reply, unless none is expected or
+                # an older one already waits for its reply
+                if not sent or waiter in self._suspect_waiters or self._abandoned is not None:
+                    self._status_waiters.remove(waiter)
+                else:
+                    expires = self._loop.time() + (timeout if timeout is not None else math.inf)
+                    self._abandoned = (waiter, expires)
+            self._suspect_waiters.discard(waiter)
+
+
+class AsyncStatusCache:
+    """asyncio counterpart of ``StatusCache``, concurrent ``get`` calls await one shared task."""
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[StatusFrame]],
+        ttl: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._fetch = fetch
+        self.ttl = ttl
+        self._clock = clock
+        self._frame: StatusFrame | None = None
+        self._fetched_at = 0.0
+        self._generation = 0
+        self._in_flight: asyncio.Task | None = None
+        self.queries = 0
+        self.hits = 0
+
+    def invalidate(self) -> None:
+        self._frame = None
+        self._generation += 1
+        self._in_flight = None
+
+    async def _query(self, generation: int) -> StatusFrame:
+        frame = await self._fetch()
+        if generation == self._generation:
+            self._frame = frame
+            self._fetched_at = self._clock()
+        return frame
+
+    async def get(self) -> StatusFrame:
+        if self._frame is not None and self._clock() - self._fetched_at < self.ttl:
+            self.hits += 1
+            return self._frame
+        if self._in_flight is None or self._in_flight.done():
+            self.queries += 1
+            self._in_flight = asyncio.ensure_future(self._query(self._generation))
+            # every caller may have timed out before the query fails, its exception is consumed here so
+            # asyncio does not report it as never retrieved
+            self._in_flight.add_done_callback(lambda task: task.cancelled() or task.exception())
+        else:
+            self.hits += 1
+        # shield: a cancelled caller must not cancel the query shared with the others
+        return await asyncio.shield(self._in_flight)
+
+
+class AsyncSerialCommander:
+    """asyncio counterpart of ``SerialCommander``, all commands are coroutines.
+
+    Every call accepts an individual timeout (defaulting to the one given to the constructor) and can be
+    cancelled without affecting other requests in flight.
+    """
+
+    def __init__(self, port: str, baudrate: int = 9600, timeout: float | None = 3.0, status_ttl: float = 0.0) -> None:
+        self.__serial_manager = AsyncSerialManager(port, baudrate)
+        self._timeout = timeout
+        self.__status_cache = AsyncStatusCache(self._query_status, status_ttl)
+
+    @property
+    def status_cache(self) -> AsyncStatusCache:
+        return self.__status_cache
+
+    async def __aenter__(self) -> "AsyncSerialCommander":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def port(self) -> str:
+        return self.__serial_manager.port
+
+    def close(self) -> None:
+        self.__serial_manager.close()
+
+    async def _send(self, command: Command, parameter: str = "", timeout: float | None = None) -> None:
+        self.__status_cache.invalidate()
+        await self.__serial_manager._send_command(
+            command, parameter, timeout if timeout is not None else self._timeout
+        )
+
+    async def set_bypass_on(self, timeout: float | None = None) -> None:
+        await self._send(Command.BYPASS_ON, timeout=timeout)
+
+    async def set_bypass_off(self, timeout: float | None = None) -> None:
+        await self._send(Command.BYPASS_OFF, timeout=timeout)
+
+    async def filter_step_up_1(self, timeout: float | None = None) -> None:
+        await self._send(Command.FILTER_STEP_UP, "1", timeout)
+
+    async def filter_step_up_10(self, timeout: float | None = None) -> None:
+        await self._send(Command.FILTER_STEP_UP, "10", timeout)
+
+    async def filter_step_down_1(self, timeout: float | None = None) -> None:
+        await self._send(Command.FILTER_STEP_DOWN, "1", timeout)
+
+    async def filter_step_down_10(self, timeout: float | None = None) -> None:
+        await self._send(Command.FILTER_STEP_DOWN, "10", timeout)
+
+    async def reset_filter(self, timeout: float | None = None) -> None:
+        await self._send(Command.FILTER_STEP_RESET, timeout=timeout)
+
+    async def set_mode_tx_on(self, timeout: float | None = None) -> None:
+        await self._send(Command.MODE_TX_ON, timeout=timeout)
+
+    async def set_mode_tx_off(self, timeout: float | None = None) -> None:
+        await self._send(Command.MODE_TX_OFF, timeout=timeout)
+
+    async def get_status(self, timeout: float | None = None) -> StatusFrame:
+        """Return the device status, concurrent callers share a single device query.
+
+        A status younger than ``status_ttl`` seconds is returned without querying the device. The timeout
+        bounds the wait of this caller only, a shared query keeps running for the others.
+        """
+        return await asyncio.wait_for(self.__status_cache.get(), timeout if timeout is not None else self._timeout)
+
+    async def _query_status(self) -> StatusFrame:
+        response = await self.__serial_manager._request_status(self._timeout)
+        try:
+            return parse_status_frame(response)
+        except BadSerialResponseException:
+            logger.error("Bad message received for get_status request")
+            raise
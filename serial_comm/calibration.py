@@ -0,0 +1,152 @@
+import bisect
+import json
+import logging
+import os
+import threading
+
+from .protocol import StatusFrame
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_PATH = os.path.join(os.path.expanduser("~"), ".local", "share", "gs_controller", "calibration.json")
+
+
+class CalibrationError(Exception):
+    pass
+
+
+class CalibrationTable:
+    """Mapping between stepper position and filter frequency, learned from observed status frames.
+
+    Observations are accumulated per stepper position. The fit groups them into up to ``segments`` bins of
+    equal observation count and interpolates linearly between the bin means, which smooths the 1 MHz
+    resolution of the reported frequency. If the bin means are not monotonic (too few or noisy
+    observations) a least squares line over all observations is used instead.
+
+    Args:
+        path (str | None): JSON file the table is loaded from and saved to, None keeps it in memory only.
+        segments (int): maximum number of interpolation segments.
+        autosave_every (int): save after this many new observations, 0 disables autosaving.
+    """
+
+    def __init__(self, path: str | None = None, segments: int = 16, autosave_every: int = 100) -> None:
+        self.path = path
+        self.segments = segments
+        self.autosave_every = autosave_every
+        self._lock = threading.Lock()
+        # position -> [sum of observed frequencies, number of observations]
+        self._points: dict[int, list] = {}
+        self._unsaved = 0
+        self._fit: tuple[list[float], list[float]] | None = None
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def observe(self, frame: StatusFrame) -> None:
+        """Learn from a status frame, frames taken while the stepper moves are ignored."""
+        if frame.moving or frame.frequency is None or frame.position is None:
+            return
+        with self._lock:
+            point = self._points.setdefault(frame.position, [0.0, 0])
+            point[0] += frame.frequency
+            point[1] += 1
+            self._fit = None
+            self._unsaved += 1
+            autosave = self.autosave_every and self._unsaved >= self.autosave_every
+        if autosave and self.path is not None:
+            self.save()
+
+    def _linear_fit(self, positions: list[int], frequencies: list[float], weights: list[int]) -> tuple[float, float]:
+        """Weighted least squares ``frequency = offset + slope * position`` over all observations."""
+        total = sum(weights)
+        mean_position = sum(p * w for p, w in zip(positions, weights)) / total
+        mean_frequency = sum(f * w for f, w in zip(frequencies, weights)) / total
+        covariance = sum(
+            w * (p - mean_position) * (f - mean_frequency) for p, f, w in zip(positions, frequencies, weights)
+        )
+        variance = sum(w * (p - mean_position) ** 2 for p, w in zip(positions, weights))
+        slope = covariance / variance
+        return mean_frequency - slope * mean_position, slope
+
+    def _compute_fit(self) -> tuple[list[float], list[float]]:
+        """Return the interpolation nodes (positions, frequencies) sorted by position."""
+        positions = sorted(self._points)
+        if len(positions) < 2:
+            raise CalibrationError("Not enough calibration data, move the filter over its range first")
+        weights = [self._points[p][1] for p in positions]
+        frequencies = [self._points[p][0] / self._points[p][1] for p in positions]
+
+        bin_size = max(1, -(-sum(weights) // self.segments))
+        node_positions, node_frequencies = [], []
+        position_sum = frequency_sum = count = 0.0
+        for position, frequency, weight in zip(positions, frequencies, weights):
+            position_sum += position * weight
+            frequency_sum += frequency * weight
+            count += weight
+            if count >= bin_size or position == positions[-1]:
+                node_positions.append(position_sum / count)
+                node_frequencies.append(frequency_sum / count)
+                position_sum = frequency_sum = count = 0.0
+
+        steps = [b - a for a, b in zip(node_frequencies, node_frequencies[1:])]
+        if len(node_positions) < 2 or not (all(s < 0 for s in steps) or all(s > 0 for s in steps)):
+            offset, slope = self._linear_fit(positions, frequencies, weights)
+            if slope == 0:
+                raise CalibrationError("Calibration data does not show any frequency change")
+            node_positions = [positions[0], positions[-1]]
+            node_frequencies = [offset + slope * p for p in node_positions]
+        return node_positions, node_frequencies
+
+    def _nodes(self) -> tuple[list[float], list[float]]:
+        with self._lock:
+            if self._fit is None:
+                self._fit = self._compute_fit()
+            return self._fit
+
+    @staticmethod
+    def _interpolate(x: float, xs: list[float], ys: list[float]) -> float:
+        """Piecewise linear interpolation over ascending ``xs``, extrapolating from the outer segments."""
+        index = min(max(bisect.bisect_left(xs, x), 1), len(xs) - 1)
+        x0, x1, y0, y1 = xs[index - 1], xs[index], ys[index - 1], ys[index]
+        return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+
+    def frequency_at(self, position: int) -> float:
+        positions, frequencies = self._nodes()
+        return self._interpolate(position, positions, frequencies)
+
+    def position_for(self, frequency_mhz: float) -> int:
+        """Return the stepper position expected to give the requested frequency."""
+        positions, frequencies = self._nodes()
+        if frequencies[0] > frequencies[-1]:
+            positions, frequencies = positions[::-1], frequencies[::-1]
+        return max(0, round(self._interpolate(frequency_mhz, frequencies, positions)))
+
+    def load(self) -> None:
+        """Replace the observations with the saved ones, an unreadable or corrupt file leaves them unchanged."""
+        try:
+            with open(self.path, encoding="UTF-8") as calibration_file:
+                data = json.load(calibration_file)
+            points = {int(position): [float(total), int(count)] for position, total, count in data["points"]}
+        except (OSError, ValueError, KeyError, TypeError) as ex:
+            logger.warning("Could not load calibration table %s: %s", self.path, ex)
+            return
+        with self._lock:
+            self._points = points
+            self._fit = None
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            data = {"points": [[position, total, count] for position, (total, count) in sorted(self._points.items())]}
+            self._unsaved = 0
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temporary_path = f"{self.path}.tmp"
+            with open(temporary_path, "w", encoding="UTF-8") as calibration_file:
+                json.dump(data, calibration_file)
+            os.replace(temporary_path, self.path)
+        except OSError as ex:
+            logger.warning("Could not save calibration table: %s", ex)
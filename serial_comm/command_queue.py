@@ -0,0 +1,102 @@
+import logging
+import threading
+from typing import Callable
+
+from .protocol import Command
+
+logger = logging.getLogger(__name__)
+
+_STEP_COMMANDS = (Command.FILTER_STEP_UP, Command.FILTER_STEP_DOWN)
+_TOGGLE_GROUPS = {
+    Command.BYPASS_ON: "bypass",
+    Command.BYPASS_OFF: "bypass",
+    Command.MODE_TX_ON: "tx_mode",
+    Command.MODE_TX_OFF: "tx_mode",
+}
+
+
+class CoalescingCommandQueue:
+    """Collects commands and merges them before they are written to the serial port.
+
+    On ``flush`` the pending commands are reduced to the smallest equivalent sequence:
+
+    * all filter steps since the last ``STr`` are summed into one net ``ST+N``/``ST-N`` command
+      (opposite steps cancel out, a net of zero is not sent at all),
+    * of repeated bypass (``STB``) or TX mode (``STT``/``STR``) toggles only the last one is kept.
+    """
+
+    def __init__(self, send: Callable[[Command, str], None]) -> None:
+        self._send = send
+        self._pending: list[tuple[Command, str]] = []
+        self._lock = threading.Lock()
+        self._requested_writes = 0
+        self._actual_writes = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def saved_writes(self) -> int:
+        """Number of serial writes avoided by coalescing so far."""
+        return self._requested_writes - self._actual_writes
+
+    def put(self, command: Command, parameter: str = "") -> None:
+        with self._lock:
+            self._pending.append((command, parameter))
+            self._requested_writes += 1
+
+    def flush(self) -> int:
+        """Send the merged pending commands.
+
+        Returns:
+            int: number of commands actually written.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        merged = self.coalesce(pending)
+        for command, parameter in merged:
+            self._send(command, parameter)
+            self._actual_writes += 1
+        if len(merged) < len(pending):
+            logger.debug("Coalesced %d commands into %d writes", len(pending), len(merged))
+        return len(merged)
+
+    @staticmethod
+    def coalesce(commands: list[tuple[Command, str]]) -> list[tuple[Command, str]]:
+        """Return the shortest command sequence equivalent to the given one."""
+        # step entries hold the net change of the stepper count as an int until they are emitted
+        merged: list[list] = []
+        last_steps: list | None = None
+        last_toggles: dict[str, list] = {}
+        for command, parameter in commands:
+            if command in _STEP_COMMANDS:
+                # FILTER_STEP_DOWN ("ST+") increases the stepper count, FILTER_STEP_UP ("ST-") decreases it
+                steps = int(parameter) if command is Command.FILTER_STEP_DOWN else -int(parameter)
+                if last_steps is None:
+                    last_steps = [None, steps]
+                    merged.append(last_steps)
+                else:
+                    last_steps[1] += steps
+            elif command in _TOGGLE_GROUPS:
+                group = _TOGGLE_GROUPS[command]
+                if group in last_toggles:
+                    previous = last_toggles[group]
+                    merged = [entry for entry in merged if entry is not previous]
+                last_toggles[group] = [command, parameter]
+                merged.append(last_toggles[group])
+            else:
+                if command is Command.FILTER_STEP_RESET:
+                    # steps before a reset must not be merged with steps after it
+                    last_steps = None
+                merged.append([command, parameter])
+
+        result = []
+        for command, parameter in merged:
+            if command is None:
+                if parameter > 0:
+                    result.append((Command.FILTER_STEP_DOWN, str(parameter)))
+                elif parameter < 0:
+                    result.append((Command.FILTER_STEP_UP, str(-parameter)))
+            else:
+                result.append((command, parameter))
+        return result
@@ -0,0 +1,212 @@
+"""Headless daemon sharing one controller link among many local clients.
+
+The daemon owns the serial port and talks newline-delimited JSON-RPC 2.0 over a Unix or TCP socket::
+
+    -> {"jsonrpc": "2.0", "id": 1, "method": "set_bypass_on"}
+    <- {"jsonrpc": "2.0", "id": 1, "result": null}
+    -> {"jsonrpc": "2.0", "id": 2, "method": "subscribe"}
+    <- {"jsonrpc": "2.0", "method": "status", "params": {"frequency": 435, ...}}
+
+Methods are the ``SerialCommander`` commands plus ``get_status`` (answered from the shared poll loop, no
+extra ``ST?`` traffic), ``subscribe``, ``unsubscribe`` and ``set_log_level`` (params ``{"subsystem":
+"serial_comm.traffic", "level": "DEBUG"}``).
+
+Usage: python -m serial_comm.daemon --port /dev/ttyUSB0 --listen unix:/tmp/gs_controller.sock
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+
+from serial import SerialException
+
+from .async_serial_comm import AsyncSerialCommander
+from .log_config import set_level, setup_logging
+from .poll_scheduler import PollConfig, PollScheduler
+from .protocol import BadSerialResponseException, StatusFrame
+
+logger = logging.getLogger(__name__)
+
+COMMAND_METHODS = (
+    "set_bypass_on",
+    "set_bypass_off",
+    "filter_step_up_1",
+    "filter_step_up_10",
+    "filter_step_down_1",
+    "filter_step_down_10",
+    "reset_filter",
+    "set_mode_tx_on",
+    "set_mode_tx_off",
+)
+# notifications are skipped for clients that do not read them fast enough
+MAX_CLIENT_BACKLOG = 64 * 1024
+# how long get_status waits for the very first poll after the daemon started
+FIRST_STATUS_TIMEOUT = 5.0
+
+PARSE_ERROR = -32700
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+DEVICE_ERROR = -32000
+
+
+class ControllerDaemon:
+    """Owns one controller, polls it and serves any number of JSON-RPC clients."""
+
+    def __init__(self, port: str, baudrate: int = 9600, poll_config: PollConfig | None = None) -> None:
+        self._serial_commander = AsyncSerialCommander(port, baudrate)
+        self._poll_scheduler = PollScheduler(poll_config)
+        self._poll_now = asyncio.Event()
+        self._status: StatusFrame | None = None
+        self._status_changed = asyncio.Condition()
+        self._subscribers: set[asyncio.StreamWriter] = set()
+
+    @property
+    def status(self) -> StatusFrame | None:
+        return self._status
+
+    async def poll_forever(self) -> None:
+        while True:
+            try:
+                frame = await self._serial_commander.get_status()
+            except (asyncio.TimeoutError, BadSerialResponseException, SerialException) as ex:
+                logger.error("Status poll failed: %s", ex)
+                self._poll_scheduler.poll_failed()
+            else:
+                self._poll_scheduler.status_received(frame)
+                await self._publish(frame)
+            try:
+                await asyncio.wait_for(self._poll_now.wait(), self._poll_scheduler.next_interval())
+            except asyncio.TimeoutError:
+                pass
+            self._poll_now.clear()
+
+    async def _publish(self, frame: StatusFrame) -> None:
+        self._status = frame
+        async with self._status_changed:
+            self._status_changed.notify_all()
+        notification = _encode({"jsonrpc": "2.0", "method": "status", "params": frame._asdict()})
+        for writer in list(self._subscribers):
+            if writer.transport.get_write_buffer_size() > MAX_CLIENT_BACKLOG:
+                logger.warning("Skipping status notification for a slow client")
+                continue
+            writer.write(notification)
+
+    async def _current_status(self) -> StatusFrame:
+        async with self._status_changed:
+            await self._status_changed.wait_for(lambda: self._status is not None)
+        return self._status
+
+    async def _call(self, method: str, params: dict, writer: asyncio.StreamWriter):
+        if method in COMMAND_METHODS:
+            await getattr(self._serial_commander, method)()
+            # confirm the change quickly
+            self._poll_scheduler.command_sent()
+            self._poll_now.set()
+            return None
+        if method == "get_status":
+            return (await asyncio.wait_for(self._current_status(), FIRST_STATUS_TIMEOUT))._asdict()
+        if method == "subscribe":
+            self._subscribers.add(writer)
+            return None
+        if method == "unsubscribe":
+            self._subscribers.discard(writer)
+            return None
+        if method == "set_log_level":
+            if "level" not in params:
+                raise ValueError("Missing parameter: level")
+            set_level(params.get("subsystem", ""), params["level"])
+            return None
+        raise LookupError(method)
+
+    async def _handle_request(self, line: bytes, writer: asyncio.StreamWriter) -> dict | None:
+        try:
+            request = json.loads(line)
+            method = request["method"]
+            params = request.get("params") or {}
+            if not isinstance(params, dict):
+                raise TypeError("params must be an object")
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return {"jsonrpc": "2.0", "id": None, "error": {"code": PARSE_ERROR, "message": "Parse error"}}
+        request_id = request.get("id")
+        try:
+            result = await self._call(method, params, writer)
+        except LookupError:
+            error = {"code": METHOD_NOT_FOUND, "message": f"Method not found: {method}"}
+        except (ValueError, TypeError) as ex:
+            error = {"code": INVALID_PARAMS, "message": str(ex)}
+        except (asyncio.TimeoutError, BadSerialResponseException, SerialException) as ex:
+            error = {"code": DEVICE_ERROR, "message": str(ex) or type(ex).__name__}
+        else:
+            return None if request_id is None else {"jsonrpc": "2.0", "id": request_id, "result": result}
+        return None if request_id is None else {"jsonrpc": "2.0", "id": request_id, "error": error}
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        logger.debug("Client connected: %s", writer.get_extra_info("peername"))
+        try:
+            while line := await reader.readline():
+                if (response := await self._handle_request(line, writer)) is not None:
+                    writer.write(_encode(response))
+                    await writer.drain()
+        except ConnectionError as ex:
+            logger.debug("Client connection lost: %s", ex)
+        finally:
+            self._subscribers.discard(writer)
+            writer.close()
+
+    def close(self) -> None:
+        self._serial_commander.close()
+
+
+def _encode(message: dict) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode("UTF-8") + b"\n"
+
+
+async def serve(port: str, listen: str, baudrate: int = 9600, poll_config: PollConfig | None = None) -> None:
+    """Run the daemon until cancelled.
+
+    Args:
+        port (str): serial port of the controller.
+        listen (str): ``unix:<path>`` or ``tcp:<host>:<port>``.
+        baudrate (int): baudrate of the serial port.
+        poll_config (PollConfig | None): status polling rates.
+    """
+    daemon = ControllerDaemon(port, baudrate, poll_config)
+    scheme, _, address = listen.partition(":")
+    if scheme == "unix":
+        if os.path.exists(address):
+            os.remove(address)
+        server = await asyncio.start_unix_server(daemon.handle_client, address)
+    elif scheme == "tcp":
+        host, _, tcp_port = address.rpartition(":")
+        server = await asyncio.start_server(daemon.handle_client, host or "127.0.0.1", int(tcp_port))
+    else:
+        raise ValueError(f"Unsupported listen address: {listen}")
+    logger.info("Serving %s on %s", port, listen)
+    poll_task = asyncio.create_task(daemon.poll_forever())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        poll_task.cancel()
+        daemon.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Share one GS controller among many local clients")
+    parser.add_argument("--port", required=True, help="serial port of the controller")
+    parser.add_argument("--baudrate", type=int, default=9600)
+    parser.add_argument(
+        "--listen", default="unix:/tmp/gs_controller.sock", help="unix:<path> or tcp:<host>:<port> to listen on"
+    )
+    args = parser.parse_args()
+    setup_logging()
+    try:
+        asyncio.run(serve(args.port, args.listen, args.baudrate, PollConfig.from_env()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
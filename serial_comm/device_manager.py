@@ -0,0 +1,228 @@
+import logging
+import os
+import selectors
+import threading
+import time
+from typing import Callable
+
+import serial
+
+from .command_queue import CoalescingCommandQueue
+from .poll_scheduler import PollConfig, PollScheduler
+from .protocol import (
+    STATUS_PREFIX,
+    BadSerialResponseException,
+    Command,
+    FrameReader,
+    StatusFrame,
+    encode_command,
+    parse_status_frame,
+)
+
+logger = logging.getLogger(__name__)
+traffic_logger = logging.getLogger("serial_comm.traffic")
+
+StatusCallback = Callable[[str, StatusFrame], None]
+DeviceErrorCallback = Callable[[str, Exception], None]
+
+
+class _Device:
+    """I/O state of one controller handled by the ``DeviceManager``."""
+
+    def __init__(self, port: str, baudrate: int, poll_config: PollConfig) -> None:
+        self.port = port
+        self.baudrate = baudrate
+        self.connection: serial.Serial | None = None
+        self.reader = FrameReader()
+        self.write_buffer = bytearray()
+        self.command_queue = CoalescingCommandQueue(self.write_command)
+        self.poll_scheduler = PollScheduler(poll_config)
+        self.status_requested_at: float | None = None
+        self.next_poll = 0.0
+
+    def write_command(self, command: Command, parameter: str = "") -> None:
+        traffic_logger.debug("SEND: %s%s to %s", command.value, parameter, self.port)
+        self.write_buffer += encode_command(command, parameter)
+
+
+class DeviceManager:
+    """Polls and commands several filter controllers from a single I/O thread.
+
+    All ports are opened non-blocking and multiplexed with ``selectors``, so adding a device adds neither a
+    thread nor a blocking read. Each device is polled according to its own ``PollScheduler``; commands given
+    to ``send`` are coalesced per device and written by the I/O thread. Callbacks are invoked on the I/O
+    thread with the port as first argument.
+
+    Args:
+        ports (list[str]): serial ports of the controllers.
+        baudrate (int): baudrate of all ports.
+        poll_config (PollConfig | None): polling rates, defaults to ``PollConfig()``.
+        reply_timeout (float): time in seconds after which a status request counts as failed.
+        on_status (StatusCallback | None): called with every received status frame.
+        on_error (DeviceErrorCallback | None): called when a device fails to open, answer or parse.
+    """
+
+    def __init__(
+        self,
+        ports: list[str],
+        baudrate: int = 9600,
+        poll_config: PollConfig | None = None,
+        reply_timeout: float = 1.0,
+        on_status: StatusCallback | None = None,
+        on_error: DeviceErrorCallback | None = None,
+    ) -> None:
+        poll_config = poll_config if poll_config is not None else PollConfig()
+        self._devices = {port: _Device(port, baudrate, poll_config) for port in ports}
+        self._reply_timeout = reply_timeout
+        self._on_status = on_status
+        self._on_error = on_error
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        os.set_blocking(self._wakeup_w, False)
+        self._thread: threading.Thread | None = None
+        self._running = False
+
+    @property
+    def ports(self) -> list[str]:
+        return list(self._devices)
+
+    def start(self) -> None:
+        self._running = True
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ)
+        self._thread = threading.Thread(target=self._run, name="DeviceManager", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._running = False
+        self._wakeup()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def send(self, port: str, command: Command, parameter: str = "") -> None:
+        """Queue a command for a device, thread-safe and non-blocking."""
+        device = self._devices[port]
+        device.command_queue.put(command, parameter)
+        self._wakeup()
+
+    def _wakeup(self) -> None:
+        try:
+            os.write(self._wakeup_w, b"\0")
+        except BlockingIOError:
+            # the I/O thread has not drained the pipe yet, it is awake anyway
+            pass
+
+    def _report_error(self, device: _Device, error: Exception) -> None:
+        logger.error("Device %s failed: %s", device.port, error)
+        if self._on_error is not None:
+            self._on_error(device.port, error)
+
+    def _open(self, device: _Device) -> bool:
+        try:
+            device.connection = serial.Serial(device.port, device.baudrate, timeout=0, write_timeout=0)
+        except serial.SerialException as ex:
+            device.connection = None
+            self._report_error(device, ex)
+            return False
+        self._selector.register(device.connection.fileno(), selectors.EVENT_READ, device)
+        return True
+
+    def _close(self, device: _Device, error: Exception) -> None:
+        if device.connection is not None:
+            self._selector.unregister(device.connection.fileno())
+            device.connection.close()
+            device.connection = None
+        device.reader.clear()
+        device.write_buffer.clear()
+        device.status_requested_at = None
+        device.poll_scheduler.poll_failed()
+        device.next_poll = time.monotonic() + device.poll_scheduler.next_interval()
+        self._report_error(device, error)
+
+    def _prepare(self, device: _Device, now: float) -> float:
+        """Queue due writes of a device, returns the time it next needs attention."""
+        if device.connection is None:
+            # (re)open attempts follow the back-off of the poll scheduler
+            if now < device.next_poll:
+                return device.next_poll
+            if not self._open(device):
+                device.poll_scheduler.poll_failed()
+                device.next_poll = now + device.poll_scheduler.next_interval()
+                return device.next_poll
+        if len(device.command_queue):
+            device.command_queue.flush()
+            device.poll_scheduler.command_sent()
+            device.next_poll = min(device.next_poll, now + device.poll_scheduler.next_interval())
+        if device.status_requested_at is not None and now - device.status_requested_at > self._reply_timeout:
+            device.status_requested_at = None
+            device.poll_scheduler.poll_failed()
+            device.next_poll = now + device.poll_scheduler.next_interval()
+            self._report_error(device, BadSerialResponseException("Timeout waiting for get_status response"))
+        if device.status_requested_at is None and now >= device.next_poll:
+            device.write_command(Command.GET_STATUS)
+            device.status_requested_at = now
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if device.write_buffer else 0)
+        self._selector.modify(device.connection.fileno(), events, device)
+        if device.status_requested_at is not None:
+            return device.status_requested_at + self._reply_timeout
+        return device.next_poll
+
+    def _read(self, device: _Device) -> None:
+        try:
+            data = os.read(device.connection.fileno(), 4096)
+        except BlockingIOError:
+            return
+        except OSError as ex:
+            self._close(device, serial.SerialException(f"Read from {device.port} failed: {ex}"))
+            return
+        if not data:
+            self._close(device, serial.SerialException(f"{device.port} disconnected"))
+            return
+        device.reader.feed(data)
+        for line in device.reader.frames():
+            if traffic_logger.isEnabledFor(logging.DEBUG):
+                traffic_logger.debug("RECEIVED: %s from %s", bytes(line), device.port)
+            if line[: len(STATUS_PREFIX)] != STATUS_PREFIX or device.status_requested_at is None:
+                continue
+            device.status_requested_at = None
+            try:
+                frame = parse_status_frame(line)
+            except BadSerialResponseException as ex:
+                device.poll_scheduler.poll_failed()
+                self._report_error(device, ex)
+            else:
+                device.poll_scheduler.status_received(frame)
+                if self._on_status is not None:
+                    self._on_status(device.port, frame)
+            device.next_poll = time.monotonic() + device.poll_scheduler.next_interval()
+
+    def _write(self, device: _Device) -> None:
+        try:
+            written = os.write(device.connection.fileno(), device.write_buffer)
+        except BlockingIOError:
+            return
+        except OSError as ex:
+            self._close(device, serial.SerialException(f"Write to {device.port} failed: {ex}"))
+            return
+        del device.write_buffer[:written]
+
+    def _run(self) -> None:
+        try:
+            while self._running:
+                now = time.monotonic()
+                deadline = min(self._prepare(device, now) for device in self._devices.values())
+                for key, events in self._selector.select(max(0.0, deadline - time.monotonic())):
+                    if key.fd == self._wakeup_r:
+                        os.read(self._wakeup_r, 4096)
+                        continue
+                    device = key.data
+                    if events & selectors.EVENT_WRITE and device.connection is not None:
+                        self._write(device)
+                    if events & selectors.EVENT_READ and device.connection is not None:
+                        self._read(device)
+        finally:
+            for device in self._devices.values():
+                if device.connection is not None:
+                    device.connection.close()
+            self._selector.close()
+            os.close(self._wakeup_r)
+            os.close(self._wakeup_w)
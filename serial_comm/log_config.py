@@ -0,0 +1,130 @@
+"""Logging pipeline for the GUI, the daemon and the command line.
+
+Records are handed to a background thread through a queue, so the thread doing serial I/O never formats
+or writes log lines itself. Repeated identical messages (e.g. the ``ST?`` poll traffic) are collapsed on
+the background thread, any change is logged immediately. Levels are set per subsystem (logger name) and
+can be changed at runtime with ``set_level``.
+
+Subsystems: ``serial_comm`` (serial layer), ``serial_comm.traffic`` (SEND/RECEIVED lines), ``wxUI`` (GUI).
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread.
+
+    The stock ``prepare`` formats the message on the calling thread; the arguments logged by this project
+    are immutable, so the record can be queued as is.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _FilteringQueueListener(logging.handlers.QueueListener):
+    """QueueListener applying a filter once per record, before the record is given to the handlers."""
+
+    def __init__(self, log_queue, record_filter: logging.Filter, *handlers: logging.Handler) -> None:
+        logging.handlers.QueueListener.__init__(self, log_queue, *handlers, respect_handler_level=True)
+        self._record_filter = record_filter
+
+    def handle(self, record: logging.LogRecord) -> None:
+        if self._record_filter.filter(record):
+            logging.handlers.QueueListener.handle(self, record)
+
+
+class RepeatFilter(logging.Filter):
+    """Collapses runs of identical messages.
+
+    A message identical to the previous one of the same call site is dropped, except that every
+    ``interval`` seconds one is let through annotated with the number of dropped repeats. A different
+    message (a state change) always passes.
+    """
+
+    def __init__(self, interval: float = 60.0) -> None:
+        logging.Filter.__init__(self)
+        self.interval = interval
+        # (logger name, format string) -> [last message, number of suppressed repeats, time last emitted]
+        self._last: dict[tuple[str, str], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, str(record.msg))
+        message = record.getMessage()
+        last = self._last.get(key)
+        now = time.monotonic()
+        if last is None or last[0] != message:
+            self._last[key] = [message, 0, now]
+            return True
+        if now - last[2] < self.interval:
+            last[1] += 1
+            return False
+        record.msg, record.args = f"{message} (repeated {last[1] + 1} times)", None
+        last[1], last[2] = 0, now
+        return True
+
+
+def parse_levels(levels: str) -> dict[str, int]:
+    """Parse ``"serial_comm=INFO,serial_comm.traffic=WARNING"`` into a subsystem to level mapping."""
+    result = {}
+    for item in filter(None, (part.strip() for part in levels.split(","))):
+        subsystem, _, level = item.rpartition("=")
+        result[subsystem] = logging.getLevelName(level.strip().upper())
+        if not isinstance(result[subsystem], int):
+            raise ValueError(f"Unknown log level: {level}")
+    return result
+
+
+def set_level(subsystem: str, level: int | str) -> None:
+    """Change the level of a subsystem at runtime, an empty subsystem name means the root logger."""
+    logging.getLogger(subsystem or None).setLevel(level.upper() if isinstance(level, str) else level)
+
+
+def setup_logging(
+    level: int | str | None = None,
+    levels: str | None = None,
+    log_file: str | None = None,
+    repeat_interval: float = 60.0,
+) -> logging.handlers.QueueListener:
+    """Install the queued logging pipeline on the root logger.
+
+    Args:
+        level (int | str | None): default level; defaults to ``$GS_LOG_LEVEL`` or INFO.
+        levels (str | None): per subsystem levels, see ``parse_levels``; defaults to ``$GS_LOG_LEVELS``.
+        log_file (str | None): also append to this file; defaults to ``$GS_LOG_FILE``.
+        repeat_interval (float): seconds between two annotated copies of a repeated message.
+
+    Returns:
+        logging.handlers.QueueListener: the started background writer, stopped automatically at exit.
+    """
+    level = os.environ.get("GS_LOG_LEVEL", logging.INFO) if level is None else level
+    levels = os.environ.get("GS_LOG_LEVELS", "") if levels is None else levels
+    log_file = os.environ.get("GS_LOG_FILE") if log_file is None else log_file
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers: list[logging.Handler] = [logging.StreamHandler(sys.stderr)]
+    if log_file:
+        handlers.append(logging.handlers.WatchedFileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = _FilteringQueueListener(log_queue, RepeatFilter(repeat_interval), *handlers)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_DeferredQueueHandler(log_queue))
+    set_level("", level)
+    for subsystem, subsystem_level in parse_levels(levels).items():
+        set_level(subsystem, subsystem_level)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,137 @@
+import bisect
+import json
+import os
+import time
+
+from .protocol import Command
+
+# upper bounds in seconds, from sub-millisecond pty round trips up to the reply timeout
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+STAGES = ("write", "read")
+
+
+class Histogram:
+    """Fixed-bucket latency histogram, cheap enough to observe every serial operation."""
+
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self) -> None:
+        # the last slot counts observations above the largest bucket
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float | None:
+        """Return the upper bound of the bucket holding the q-quantile, None without observations."""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS, self.counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return bound
+        return float("inf")
+
+
+class SerialMetrics:
+    """Counters and latency histograms of one serial link.
+
+    Updated from the thread doing the I/O without locking; snapshots taken from other threads may be off
+    by the operation in progress, which is fine for monitoring.
+    """
+
+    def __init__(self) -> None:
+        self.started_at = time.time()
+        self.commands = {command: 0 for command in Command}
+        self.latency = {(stage, command): Histogram() for stage in STAGES for command in Command}
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.timeouts = 0
+        self.bad_responses = 0
+        # received lines that did not answer a pending status request
+        self.unsolicited = 0
+        self.opens = 0
+        self.reconnects = 0
+
+    def snapshot(self) -> dict:
+        latency = {}
+        for (stage, command), histogram in self.latency.items():
+            if histogram.count:
+                latency.setdefault(stage, {})[command.name] = {
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "buckets": dict(zip([*map(str, LATENCY_BUCKETS), "+Inf"], histogram.counts)),
+                }
+        return {
+            "timestamp": time.time(),
+            "started_at": self.started_at,
+            "commands": {command.name: count for command, count in self.commands.items()},
+            "latency_seconds": latency,
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "timeouts": self.timeouts,
+            "bad_responses": self.bad_responses,
+            "unsolicited": self.unsolicited,
+            "opens": self.opens,
+            "reconnects": self.reconnects,
+        }
+
+    def to_prometheus(self, port: str = "") -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        port_label = f'port="{port}"'
+        lines = ["# TYPE gs_serial_commands_total counter"]
+        lines += [
+            f'gs_serial_commands_total{{{port_label},command="{command.name}"}} {count}'
+            for command, count in self.commands.items()
+        ]
+        lines.append("# TYPE gs_serial_latency_seconds histogram")
+        for (stage, command), histogram in self.latency.items():
+            if not histogram.count:
+                continue
+            labels = f'{port_label},stage="{stage}",command="{command.name}"'
+            cumulative = 0
+            for bound, bucket_count in zip([*map(str, LATENCY_BUCKETS), "+Inf"], histogram.counts):
+                cumulative += bucket_count
+                lines.append(f'gs_serial_latency_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"gs_serial_latency_seconds_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"gs_serial_latency_seconds_count{{{labels}}} {histogram.count}")
+        for name, value in (
+            ("bytes_out", self.bytes_out),
+            ("bytes_in", self.bytes_in),
+            ("timeouts", self.timeouts),
+            ("bad_responses", self.bad_responses),
+            ("unsolicited", self.unsolicited),
+            ("opens", self.opens),
+            ("reconnects", self.reconnects),
+        ):
+            lines.append(f"# TYPE gs_serial_{name}_total counter")
+            lines.append(f"gs_serial_{name}_total{{{port_label}}} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, path: str, port: str = "") -> None:
+        """Atomically write a snapshot, JSON if the path ends with ``.json``, Prometheus text otherwise."""
+        if path.endswith(".json"):
+            content = json.dumps({"port": port, **self.snapshot()}, indent=2)
+        else:
+            content = self.to_prometheus(port)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w", encoding="UTF-8") as snapshot_file:
+            snapshot_file.write(content)
+        # scrapers never see a partially written file
+        os.replace(temporary_path, path)
+
+    def summary(self) -> str:
+        """Short human readable summary for a status bar."""
+        round_trip = self.latency[("read", Command.GET_STATUS)].quantile(0.5)
+        round_trip_text = "-" if round_trip is None else f"<{round_trip * 1000:g} ms"
+        return (
+            f"status p50 {round_trip_text} | timeouts {self.timeouts} | bad {self.bad_responses}"
+            f" | reconnects {self.reconnects}"
+        )
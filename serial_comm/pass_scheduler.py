@@ -0,0 +1,206 @@
+import inspect
+import logging
+import re
+import threading
+import time
+from typing import Callable, NamedTuple
+
+from serial import SerialException
+
+from .calibration import CalibrationError
+from .protocol import BadSerialResponseException
+from .serial_comm import SerialCommander
+
+logger = logging.getLogger(__name__)
+
+# SerialCommander methods a plan may call, queries and housekeeping like close or flush_commands are left out
+PLAN_OPERATIONS = (
+    "set_bypass_on",
+    "set_bypass_off",
+    "set_mode_tx_on",
+    "set_mode_tx_off",
+    "filter_step_up_1",
+    "filter_step_up_10",
+    "filter_step_down_1",
+    "filter_step_down_10",
+    "filter_step",
+    "reset_filter",
+    "tune_to",
+)
+
+# "AOS", "T-30", "T+120.5", "T+0"
+_OFFSET_PATTERN = re.compile(r"^(?:AOS|T(?P<offset>[+-]\d+(?:\.\d+)?))$")
+
+
+class PlannedCommand(NamedTuple):
+    """A command of a pass plan.
+
+    Attributes:
+        offset (float): execution time in seconds relative to the acquisition of signal (AOS).
+        operation (str): name of the ``SerialCommander`` method to call.
+        args (tuple): positional arguments of the method.
+    """
+
+    offset: float
+    operation: str
+    args: tuple = ()
+
+
+class ExecutionRecord(NamedTuple):
+    """Outcome of one planned command, times are seconds relative to AOS on the monotonic clock.
+
+    Attributes:
+        command (PlannedCommand): the planned command.
+        started (float | None): when the call started, None if the command was skipped.
+        finished (float | None): when the call returned.
+        error (str | None): the failure, or why the command was skipped.
+    """
+
+    command: PlannedCommand
+    started: float | None
+    finished: float | None
+    error: str | None = None
+
+    @property
+    def lateness(self) -> float | None:
+        """Start time minus planned time in seconds."""
+        return None if self.started is None else self.started - self.command.offset
+
+
+def _parse_argument(text: str) -> int | float | str:
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+def _check_arguments(operation: str, args: tuple) -> None:
+    """Raise ``TypeError`` if ``args`` do not fit the signature of the operation."""
+    signature = inspect.signature(getattr(SerialCommander, operation))
+    bound = signature.bind(None, *args)
+    parameters = signature.parameters
+    for name, value in bound.arguments.items():
+        annotation = parameters[name].annotation
+        if annotation is int and not isinstance(value, int):
+            raise TypeError(f"{name} must be an integer, got {value!r}")
+        if annotation is float and not isinstance(value, (int, float)):
+            raise TypeError(f"{name} must be a number, got {value!r}")
+
+
+def parse_pass_plan(text: str) -> list[PlannedCommand]:
+    """Parse a pass plan, one ``<time> <operation> [arguments...]`` per line.
+
+    The time is ``AOS`` or an offset to it in seconds (``T-30``, ``T+120``), the operation one of
+    ``PLAN_OPERATIONS`` with arguments matching its ``SerialCommander`` signature. Empty lines and ``#``
+    comments are ignored. Example::
+
+        T-30   tune_to 436.5
+        AOS    set_bypass_off
+        T+120  set_mode_tx_on
+        T+180  set_mode_tx_off
+
+    Raises:
+        ValueError: on a malformed line, an unknown operation or arguments not matching the operation.
+
+    Returns:
+        list[PlannedCommand]: the commands ordered by time, commands of equal time keep their order.
+    """
+    commands = []
+    for number, line in enumerate(text.splitlines(), 1):
+        fields = line.split("#", 1)[0].split()
+        if not fields:
+            continue
+        match = _OFFSET_PATTERN.match(fields[0])
+        if match is None or len(fields) < 2:
+            raise ValueError(f"Line {number}: expected '<AOS|T+seconds|T-seconds> <operation> [args...]'")
+        operation = fields[1]
+        if operation not in PLAN_OPERATIONS:
+            raise ValueError(f"Line {number}: unknown operation {operation!r}")
+        args = tuple(map(_parse_argument, fields[2:]))
+        try:
+            _check_arguments(operation, args)
+        except TypeError as ex:
+            raise ValueError(f"Line {number}: bad arguments for {operation}: {ex}") from ex
+        offset = float(match.group("offset") or 0)
+        commands.append(PlannedCommand(offset, operation, args))
+    return sorted(commands, key=lambda command: command.offset)
+
+
+class PassScheduler(threading.Thread):
+    """Executes a pass plan against a ``SerialCommander`` on its own thread.
+
+    The AOS time is given on the wall clock and converted once to the monotonic clock, so neither clock
+    adjustments nor stalls of the GUI event loop move the commands. The thread sleeps until ``spin``
+    seconds before a command is due and busy-waits the rest, which keeps the start of a command within
+    about a millisecond of its planned time. Commands run in order; a slow one (e.g. ``tune_to`` waiting
+    for the stepper) delays the ones after it, which shows in their ``lateness``.
+
+    Commands more than ``max_lateness`` seconds overdue (e.g. the plan was started after AOS) are skipped.
+    ``on_executed`` is called on the scheduler thread with every ``ExecutionRecord``.
+    """
+
+    def __init__(
+        self,
+        serial_commander: SerialCommander,
+        plan: list[PlannedCommand],
+        aos: float,
+        max_lateness: float = 5.0,
+        spin: float = 0.002,
+        on_executed: Callable[[ExecutionRecord], None] | None = None,
+    ) -> None:
+        threading.Thread.__init__(self, name="PassScheduler", daemon=True)
+        self._serial_commander = serial_commander
+        self._plan = sorted(plan, key=lambda command: command.offset)
+        self._aos_monotonic = time.monotonic() + (aos - time.time())
+        self._max_lateness = max_lateness
+        self._spin = spin
+        self._on_executed = on_executed
+        self._stopped = threading.Event()
+        self.records: list[ExecutionRecord] = []
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Cancel the commands not executed yet."""
+        self._stopped.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+    def _now(self) -> float:
+        return time.monotonic() - self._aos_monotonic
+
+    def _wait_until(self, offset: float) -> bool:
+        """Wait for the given time relative to AOS, returns False if stopped meanwhile."""
+        remaining = offset - self._now()
+        if remaining > self._spin and self._stopped.wait(remaining - self._spin):
+            return False
+        while self._now() < offset:
+            pass
+        return not self._stopped.is_set()
+
+    def _execute(self, command: PlannedCommand) -> ExecutionRecord:
+        lateness = self._now() - command.offset
+        if lateness > self._max_lateness:
+            return ExecutionRecord(command, None, None, f"skipped, {lateness:.3f} s overdue")
+        started = self._now()
+        try:
+            getattr(self._serial_commander, command.operation)(*command.args)
+        except (SerialException, BadSerialResponseException, CalibrationError) as ex:
+            logger.error("Planned %s at T%+.3f failed: %s", command.operation, command.offset, ex)
+            return ExecutionRecord(command, started, self._now(), str(ex))
+        except Exception as ex:
+            # a failing command must never cost the rest of the plan
+            logger.exception("Planned %s at T%+.3f failed", command.operation, command.offset)
+            return ExecutionRecord(command, started, self._now(), f"{type(ex).__name__}: {ex}")
+        return ExecutionRecord(command, started, self._now())
+
+    def run(self) -> None:
+        for command in self._plan:
+            if not self._wait_until(command.offset):
+                logger.info("Pass plan stopped, %d commands not executed", len(self._plan) - len(self.records))
+                return
+            record = self._execute(command)
+            self.records.append(record)
+            logger.debug("T%+.3f %s: %s", command.offset, command.operation, record)
+            if self._on_executed is not None:
+                self._on_executed(record)
@@ -0,0 +1,97 @@
+import os
+import time
+from typing import Callable, Mapping, NamedTuple
+
+from .protocol import StatusFrame
+
+
+class PollConfig(NamedTuple):
+    """Status polling rates, all times in seconds.
+
+    Attributes:
+        fast_interval (float): interval used right after a command was sent.
+        burst_duration (float): how long to keep polling fast after a command.
+        interval (float): normal polling interval.
+        idle_interval (float): interval once the device state did not change for ``idle_after`` polls.
+        idle_after (int): number of unchanged status frames after which polling slows down.
+        max_backoff (float): upper bound of the interval while polls keep failing.
+    """
+
+    fast_interval: float = 0.1
+    burst_duration: float = 1.0
+    interval: float = 1.0
+    idle_interval: float = 5.0
+    idle_after: int = 10
+    max_backoff: float = 30.0
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] = os.environ) -> "PollConfig":
+        """Build the configuration of this deployment from ``GS_POLL_*`` environment variables.
+
+        Intervals are given in milliseconds: ``GS_POLL_FAST_MS``, ``GS_POLL_BURST_MS``, ``GS_POLL_INTERVAL_MS``,
+        ``GS_POLL_IDLE_MS``, ``GS_POLL_MAX_BACKOFF_MS``; ``GS_POLL_IDLE_AFTER`` is a number of polls.
+        """
+        defaults = cls()
+        return cls(
+            fast_interval=float(environ.get("GS_POLL_FAST_MS", defaults.fast_interval * 1000)) / 1000,
+            burst_duration=float(environ.get("GS_POLL_BURST_MS", defaults.burst_duration * 1000)) / 1000,
+            interval=float(environ.get("GS_POLL_INTERVAL_MS", defaults.interval * 1000)) / 1000,
+            idle_interval=float(environ.get("GS_POLL_IDLE_MS", defaults.idle_interval * 1000)) / 1000,
+            idle_after=int(environ.get("GS_POLL_IDLE_AFTER", defaults.idle_after)),
+            max_backoff=float(environ.get("GS_POLL_MAX_BACKOFF_MS", defaults.max_backoff * 1000)) / 1000,
+        )
+
+
+class PollScheduler:
+    """Decides when the next status poll is due.
+
+    Polls fast for a short burst after a command (or while the stepper is moving), slows down once the
+    state is stable and backs off exponentially while polls fail.
+    """
+
+    def __init__(self, config: PollConfig | None = None, clock: Callable[[], float] = time.monotonic) -> None:
+        self.config = config if config is not None else PollConfig()
+        self._clock = clock
+        self._burst_until = 0.0
+        self._last_frame: StatusFrame | None = None
+        self._unchanged_polls = 0
+        self._failures = 0
+
+    @property
+    def failures(self) -> int:
+        """Number of consecutive failed polls."""
+        return self._failures
+
+    def command_sent(self) -> None:
+        self._burst_until = self._clock() + self.config.burst_duration
+        self._unchanged_polls = 0
+
+    def status_received(self, frame: StatusFrame) -> None:
+        self._failures = 0
+        if frame.moving:
+            # keep confirming until the stepper has settled
+            self._burst_until = max(self._burst_until, self._clock() + self.config.fast_interval)
+        if frame == self._last_frame:
+            self._unchanged_polls += 1
+        else:
+            self._unchanged_polls = 0
+        self._last_frame = frame
+
+    def poll_failed(self) -> None:
+        self._failures += 1
+
+    def reset(self) -> None:
+        self._burst_until = 0.0
+        self._last_frame = None
+        self._unchanged_polls = 0
+        self._failures = 0
+
+    def next_interval(self) -> float:
+        """Return the delay in seconds until the next status poll."""
+        if self._failures:
+            return min(self.config.interval * 2 ** min(self._failures - 1, 32), self.config.max_backoff)
+        if self._clock() < self._burst_until:
+            return self.config.fast_interval
+        if self._unchanged_polls >= self.config.idle_after:
+            return self.config.idle_interval
+        return self.config.interval
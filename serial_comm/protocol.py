@@ -0,0 +1,143 @@
+from enum import Enum
+from functools import lru_cache
+from typing import Iterator, NamedTuple
+
+
+class Command(str, Enum):
+    BYPASS_ON = "STB1"
+    BYPASS_OFF = "STB0"
+    FILTER_STEP_UP = "ST-"  # To *increase* the filter frequency actually *decrease* the stepper motor step count
+    FILTER_STEP_DOWN = "ST+"  # To *decrease* the filter frequency actually *increase* the stepper motor step count
+    FILTER_STEP_RESET = "STr"
+    MODE_TX_ON = "STT"
+    MODE_TX_OFF = "STR"
+    GET_STATUS = "ST?"
+
+
+class BadSerialResponseException(Exception):
+    pass
+
+
+STATUS_PREFIX = b"STST"
+STATUS_FIELD_COUNT = 6
+
+# Bytes sent for parameterless commands, built once instead of on every write
+COMMAND_BYTES = {command: (command.value + "\n").encode("UTF-8") for command in Command}
+
+
+@lru_cache(maxsize=128)
+def encode_command(command: Command, parameter: str = "") -> bytes:
+    """Return the line to write for a command, the handful of distinct commands is cached."""
+    if not parameter:
+        return COMMAND_BYTES[command]
+    return (command.value + parameter + "\n").encode("UTF-8")
+
+
+class StatusFrame(NamedTuple):
+    """Decoded reply to ``ST?``: ``STST,<frequency>,<position>,<bypass>,<moving>,<tx_mode>``.
+
+    Attributes:
+        frequency (int | None): filter frequency in MHz, None if the device reported a non numeric value.
+        position (int | None): stepper motor step count, None if not numeric.
+        bypass (bool): filter bypass enabled.
+        moving (bool): stepper motor still moving.
+        tx_mode (bool): forced TX mode enabled.
+    """
+
+    frequency: int | None
+    position: int | None
+    bypass: bool
+    moving: bool
+    tx_mode: bool
+
+
+def parse_status_frame(data: bytes | bytearray | memoryview) -> StatusFrame:
+    """Parse a status reply straight from the received bytes.
+
+    The device repeats the same line while nothing changes, so decoded frames are cached by line; a
+    repeated line costs a copy of its bytes and a dictionary lookup.
+
+    Args:
+        data (bytes | bytearray | memoryview): a single line, with or without the line terminator.
+
+    Raises:
+        BadSerialResponseException: if the line is not a status reply with the expected field count.
+
+    Returns:
+        StatusFrame: the decoded status.
+    """
+    return _parse_status_line(bytes(data))
+
+
+@lru_cache(maxsize=256)
+def _parse_status_line(line: bytes) -> StatusFrame:
+    fields = line.rstrip(b"\r\n").split(b",")
+    if len(fields) != STATUS_FIELD_COUNT or fields[0] != STATUS_PREFIX:
+        raise BadSerialResponseException(f"Bad response for get_status request: {line!r}")
+    _, frequency, position, bypass, moving, tx_mode = fields
+    return StatusFrame(
+        int(frequency) if frequency.isdigit() else None,
+        int(position) if position.isdigit() or position[:1] == b"-" and position[1:].isdigit() else None,
+        bypass != b"0",
+        moving != b"0",
+        tx_mode != b"0",
+    )
+
+
+class FrameReader:
+    """Incrementally splits received bytes into ``\\n`` terminated frames.
+
+    Received bytes are copied into a buffer allocated once, complete frames are handed out as
+    ``memoryview`` slices of it without the line terminator, so splitting does not copy. A frame is only
+    valid until the next ``feed``.
+    """
+
+    def __init__(self, capacity: int = 4096) -> None:
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        # first byte not yet handed out in a frame, end of the received bytes, where the next search starts
+        self._start = 0
+        self._end = 0
+        self._scan = 0
+        self.overflows = 0
+
+    def __len__(self) -> int:
+        """Number of buffered bytes that do not form a complete frame yet."""
+        return self._end - self._start
+
+    def clear(self) -> None:
+        self._start = self._end = self._scan = 0
+
+    def feed(self, data: bytes) -> None:
+        size = len(data)
+        capacity = len(self._buffer)
+        if self._end + size > capacity:
+            pending = self._end - self._start
+            if pending + size > capacity:
+                # no frame of this protocol comes close to the capacity, the partial frame is garbage
+                self.overflows += 1
+                self.clear()
+                pending = 0
+                if size > capacity:
+                    data = data[-capacity:]
+                    size = capacity
+            else:
+                self._view[:pending] = self._view[self._start : self._end]
+                self._scan -= self._start
+                self._start = 0
+                self._end = pending
+        self._view[self._end : self._end + size] = data
+        self._end += size
+
+    def frames(self) -> Iterator[memoryview]:
+        """Yield the complete frames received so far, frames not consumed stay buffered."""
+        buffer = self._buffer
+        while (end := buffer.find(b"\n", self._scan, self._end)) != -1:
+            frame_end = end - 1 if end > self._start and buffer[end - 1] == 0x0D else end
+            frame = self._view[self._start : frame_end]
+            self._start = self._scan = end + 1
+            yield frame
+        self._scan = self._end
+        if self._start == self._end:
+            # everything consumed, start over at the front to avoid moving bytes later
+            self.clear()
@@ -1,108 +1,455 @@
+import json
 import logging
-from enum import Enum
+import os
+import select
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from time import perf_counter, sleep
 
 import serial
 from serial.tools import list_ports
+from serial.tools.list_ports_common import ListPortInfo
 
-logging.basicConfig(level=logging.DEBUG)
+from .calibration import CalibrationError, CalibrationTable
+from .command_queue import CoalescingCommandQueue
+from .metrics import SerialMetrics
+from .protocol import (
+    STATUS_PREFIX,
+    BadSerialResponseException,
+    Command,
+    FrameReader,
+    StatusFrame,
+    encode_command,
+    parse_status_frame,
+)
+from .status_cache import StatusCache
+from .telemetry import TelemetryRecorder
 
+logger = logging.getLogger(__name__)
+# SEND/RECEIVED lines of the serial traffic, usually the noisiest subsystem
+traffic_logger = logging.getLogger("serial_comm.traffic")
 
-class Command(str, Enum):
-    BYPASS_ON = "STB1"
-    BYPASS_OFF = "STB0"
-    FILTER_STEP_UP = "ST-"  # To *increase* the filter frequency actually *decrease* the stepper motor step count
-    FILTER_STEP_DOWN = "ST+"  # To *decrease* the filter frequency actually *increase* the stepper motor step count
-    FILTER_STEP_RESET = "STr"
-    MODE_TX_ON = "STT"
-    MODE_TX_OFF = "STR"
-    GET_STATUS = "ST?"
+PORT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "gs_controller", "ports.json")
 
 
-class BadSerialResponseException(Exception):
-    pass
+class SerialManager:
+    """Serial link to one controller.
 
+    Commands are queued in a write buffer and written together, several commands can be on the wire before
+    the reply of a status request is read. Received bytes are split into lines by a ``FrameReader``, lines
+    that are not the reply to the current status request (e.g. a late reply of a request that already
+    timed out) are counted and dropped.
+    """
 
-class SerialManager:
-    def __init__(self, port: str, baudrate: int = 9600) -> None:
+    def __init__(
+        self,
+        port: str,
+        baudrate: int = 9600,
+        recorder: TelemetryRecorder | None = None,
+        metrics: SerialMetrics | None = None,
+        reply_timeout: float = 1.0,
+    ) -> None:
         self._port = port
         self._baudrate = baudrate
         self._connection = None
+        self._recorder = recorder
+        self._reply_timeout = reply_timeout
+        self._reader = FrameReader()
+        self._write_buffer = bytearray()
+        self._queued: list[Command] = []
+        self.metrics = metrics if metrics is not None else SerialMetrics()
+        self._read_latency = self.metrics.latency[("read", Command.GET_STATUS)]
+
+    @property
+    def recorder(self) -> TelemetryRecorder | None:
+        return self._recorder
 
     def _open_serial(self) -> None:
         """Lazy initializer of serial connection."""
         if self._connection is None:
-            self._connection = serial.Serial(self._port, self._baudrate, timeout=3)
+            # a read returns as soon as any byte arrived, the timeout only bounds the wait for the first one
+            self._connection = serial.Serial(self._port, self._baudrate, timeout=self._reply_timeout)
+            self.metrics.opens += 1
         if not self._connection.is_open:
+            # reopened after close(), e.g. by a long running daemon; owners that replace the whole manager
+            # on a reconnect (the GUI) count it themselves
             self._connection.open()
+            self.metrics.opens += 1
+            self.metrics.reconnects += 1
+
+    def close(self) -> None:
+        if self._connection is not None and self._connection.is_open:
+            self._connection.close()
+        self._reader.clear()
+        self._write_buffer.clear()
+        self._queued.clear()
+
+    def _queue_command(self, command: Command, parameter: str = "") -> None:
+        """Append a command to the write buffer, it is written by the next ``_write_pending``."""
+        command_bytes = encode_command(command, parameter)
+        traffic_logger.debug("SEND: %s%s to %s", command.value, parameter, self._port)
+        self._write_buffer += command_bytes
+        self._queued.append(command)
+        self.metrics.commands[command] += 1
+        if self._recorder is not None and command is not Command.GET_STATUS:
+            self._recorder.record_command(command, parameter)
+
+    def _write_pending(self) -> None:
+        """Write all queued commands at once.
+
+        The port is not drained (``tcdrain``) after the write, the bytes go out while the caller already
+        waits for a reply or queues the next command.
+        """
+        if not self._write_buffer:
+            return
+        self._open_serial()
+        start = perf_counter()
+        self._connection.write(self._write_buffer)
+        # the write of a batch is attributed to its last command, usually the status request that ends it
+        self.metrics.latency[("write", self._queued[-1])].observe(perf_counter() - start)
+        self.metrics.bytes_out += len(self._write_buffer)
+        self._write_buffer.clear()
+        self._queued.clear()
 
     def _send_command(self, command: Command, parameter: str = "") -> None:
+        self._queue_command(command, parameter)
+        self._write_pending()
+
+    def _receive(self, timeout: float | None = None) -> bool:
+        """Move the bytes received so far into the frame reader, waiting up to ``timeout`` for the first.
+
+        Args:
+            timeout (float | None): longest wait in seconds if nothing is buffered, None keeps the port timeout.
+
+        Returns:
+            bool: False if nothing arrived in time.
+        """
+        connection = self._connection
+        waiting = connection.in_waiting
+        if not waiting and timeout is not None:
+            if not self._wait_readable(timeout):
+                return False
+            waiting = connection.in_waiting
+        data = connection.read(waiting or 1)
+        if not data:
+            return False
+        self.metrics.bytes_in += len(data)
+        self._reader.feed(data)
+        return True
+
+    def _wait_readable(self, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for received bytes, returns False if none arrived.
+
+        Changing the port timeout instead would cost a ``tcsetattr`` per read, at 9600 baud a reply arrives
+        a byte or two per read.
+        """
+        if os.name != "posix":
+            # no select() on Windows serial handles, the port timeout bounds the next read instead
+            self._connection.timeout = timeout
+            return True
+        readable, _, _ = select.select([self._connection], [], [], timeout)
+        return bool(readable)
+
+    def _drop_frame(self, frame: memoryview) -> None:
+        self.metrics.unsolicited += 1
+        logger.info("Unsolicited message from %s: %s", self._port, bytes(frame))
+
+    def _discard_input(self) -> None:
+        """Drop lines received since the last status reply, e.g. the late reply of a timed out request."""
+        connection = self._connection
+        if connection is not None and connection.is_open and connection.in_waiting:
+            self._receive()
+        for frame in self._reader.frames():
+            self._drop_frame(frame)
+
+    def _request_status(self) -> memoryview:
+        """Write the queued commands followed by a status request and return the reply line.
+
+        Raises:
+            BadSerialResponseException: if no status reply arrived within the reply timeout.
+
+        Returns:
+            memoryview: the reply without the line terminator, valid until the next request.
+        """
         self._open_serial()
-        command_string = command.value + parameter + "\n"
-        logging.debug("SEND: %s to %s", command_string[:-1], self._port)
-        self._connection.write(command_string.encode("UTF-8"))
-        self._connection.flush()
+        self._discard_input()
+        self._queue_command(Command.GET_STATUS)
+        self._write_pending()
+        start = perf_counter()
+        deadline = start + self._reply_timeout
+        while True:
+            for frame in self._reader.frames():
+                if traffic_logger.isEnabledFor(logging.DEBUG):
+                    traffic_logger.debug("RECEIVED: %s from %s", bytes(frame), self._port)
+                if frame[: len(STATUS_PREFIX)] == STATUS_PREFIX:
+                    self._read_latency.observe(perf_counter() - start)
+                    return frame
+                self._drop_frame(frame)
+            remaining = deadline - perf_counter()
+            if remaining <= 0:
+                break
+            # a read must not wait a whole reply timeout once part of it is used up
+            self._receive(remaining)
+        self._read_latency.observe(perf_counter() - start)
+        self.metrics.timeouts += 1
+        raise BadSerialResponseException(f"No reply to get_status request from {self._port}")
 
-    def _read_from_serial(self) -> str:
-        message = self._connection.readline().decode("UTF-8").replace("\r\n", "")
-        logging.debug("RECEIVED: %s from %s", message, self._port)
-        return message
+    @staticmethod
+    def _probe_port(device: str, timeout: float) -> bool:
+        """Check if the controller answers a status request on the given port."""
+        try:
+            with serial.Serial(device, 9600, timeout=timeout, write_timeout=timeout) as ser:
+                ser.reset_input_buffer()
+                ser.write(b"ST?\n")
+                return ser.read(4) == b"STST"
+        except (serial.SerialException, OSError) as ex:
+            logger.debug("Probing %s failed: %s", device, ex)
+            return False
 
     @staticmethod
-    def get_com_ports() -> list[str]:
+    def get_com_ports(timeout: float = 2.0) -> list[str]:
         """Return list of available com (serial) ports
 
+        The last known controller (looked up in the on-disk cache by USB VID/PID/serial number) is probed
+        first; if it does not answer all ports are probed in parallel within the given timeout. Additional
+        ports (e.g. a ``VirtualDevice``) can be listed in the ``GS_EXTRA_PORTS`` environment variable,
+        separated by ``os.pathsep``.
+
+        Args:
+            timeout (float): overall deadline of the discovery in seconds.
+
         Returns:
             list[str]: absolute paths of com (serial) ports available on host
-            first element is found device serial port.
+            ranked so that found controllers come first, then other USB ports, then the rest.
         """
-        ports = [port.device for port in list_ports.comports()]
-        for p in ports:
-             with serial.Serial(p, 9600, timeout=2) as ser:
-                 ser.write(b'ST?\n')
-                 res = ser.read(4)
-                 if res == b'STST':
-                     logging.debug(f"Correct serial found: {p}")
-                     po = ports[0]
-                     ports[0] = ports[ports.index(p)]
-                     ports[ports.index(p)]
-        return ports
+        port_infos = list_ports.comports()
+        # ports list_ports cannot see, e.g. pseudo-terminals of a VirtualDevice
+        known_devices = {p.device for p in port_infos}
+        port_infos += [
+            ListPortInfo(device)
+            for device in os.environ.get("GS_EXTRA_PORTS", "").split(os.pathsep)
+            if device and device not in known_devices
+        ]
+        cache = _load_port_cache()
+        known_keys = cache.get("controllers", [])
+
+        controllers: list[str] = []
+        for port_info in sorted(
+            (p for p in port_infos if _device_key(p) in known_keys), key=lambda p: known_keys.index(_device_key(p))
+        ):
+            if SerialManager._probe_port(port_info.device, min(timeout, 0.5)):
+                logger.debug("Known controller found: %s", port_info.device)
+                controllers.append(port_info.device)
+                break
+        else:
+            executor = ThreadPoolExecutor(max_workers=max(1, len(port_infos)), thread_name_prefix="PortProbe")
+            futures = {executor.submit(SerialManager._probe_port, p.device, timeout): p for p in port_infos}
+            done, _ = wait(futures, timeout=timeout)
+            # do not wait for ports that missed the deadline, their probes end on their own serial timeout
+            executor.shutdown(wait=False, cancel_futures=True)
+            controllers = [futures[f].device for f in done if f.result()]
+            for device in controllers:
+                logger.debug("Correct serial found: %s", device)
+
+        found_keys = [_device_key(p) for p in port_infos if p.device in controllers and _device_key(p) is not None]
+        if found_keys:
+            cache["controllers"] = found_keys + [k for k in known_keys if k not in found_keys]
+            _save_port_cache(cache)
+
+        def rank(port_info) -> tuple:
+            key = _device_key(port_info)
+            return (
+                port_info.device not in controllers,
+                known_keys.index(key) if key in known_keys else len(known_keys),
+                port_info.vid is None,
+                port_info.device,
+            )
+
+        return [p.device for p in sorted(port_infos, key=rank)]
+
+
+def _device_key(port_info) -> str | None:
+    """Return a stable identifier of a USB serial adapter or None for non USB ports."""
+    if port_info.vid is None:
+        return None
+    return f"{port_info.vid:04x}:{port_info.pid:04x}:{port_info.serial_number or ''}"
+
+
+def _load_port_cache() -> dict:
+    try:
+        with open(PORT_CACHE_PATH, encoding="UTF-8") as cache_file:
+            return json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_port_cache(cache: dict) -> None:
+    try:
+        os.makedirs(os.path.dirname(PORT_CACHE_PATH), exist_ok=True)
+        with open(PORT_CACHE_PATH, "w", encoding="UTF-8") as cache_file:
+            json.dump(cache, cache_file)
+    except OSError as ex:
+        logger.warning("Could not save serial port cache: %s", ex)
 
 
 class SerialCommander:
-    def __init__(self, port: str, baudrate: int = 9600) -> None:
-        self.__serial_manager = SerialManager(port, baudrate)
+    def __init__(
+        self,
+        port: str,
+        baudrate: int = 9600,
+        coalesce: bool = False,
+        recorder: TelemetryRecorder | None = None,
+        status_ttl: float = 0.0,
+        metrics: SerialMetrics | None = None,
+        calibration: CalibrationTable | None = None,
+        reply_timeout: float = 1.0,
+    ) -> None:
+        self.__serial_manager = SerialManager(port, baudrate, recorder, metrics, reply_timeout)
+        # the merged commands are written together with the next status request or flush
+        self.__command_queue = CoalescingCommandQueue(self.__serial_manager._queue_command) if coalesce else None
+        # serializes the serial I/O of callers on different threads
+        self.__io_lock = threading.RLock()
+        self.__status_cache = StatusCache(self._query_status, status_ttl)
+        # learns the position to frequency mapping from every status frame
+        self.calibration = calibration
+
+    @property
+    def metrics(self) -> SerialMetrics:
+        return self.__serial_manager.metrics
+
+    @property
+    def status_cache(self) -> StatusCache:
+        return self.__status_cache
+
+    def close(self) -> None:
+        self.__serial_manager.close()
+
+    def _send(self, command: Command, parameter: str = "") -> None:
+        # every command changes the device state, a cached status is stale from now on
+        self.__status_cache.invalidate()
+        if self.__command_queue is None:
+            with self.__io_lock:
+                self.__serial_manager._send_command(command, parameter)
+        else:
+            self.__command_queue.put(command, parameter)
+
+    def has_pending_commands(self) -> bool:
+        return self.__command_queue is not None and len(self.__command_queue) > 0
+
+    def flush_commands(self) -> None:
+        """Write the commands held back for coalescing (no-op if coalescing is disabled)."""
+        if self.__command_queue is not None:
+            with self.__io_lock:
+                self.__command_queue.flush()
+                self.__serial_manager._write_pending()
+
+    @property
+    def saved_writes(self) -> int:
+        """Number of serial writes avoided by coalescing."""
+        return 0 if self.__command_queue is None else self.__command_queue.saved_writes
 
     def set_bypass_on(self) -> None:
-        self.__serial_manager._send_command(Command.BYPASS_ON)
+        self._send(Command.BYPASS_ON)
 
     def set_bypass_off(self) -> None:
-        self.__serial_manager._send_command(Command.BYPASS_OFF)
+        self._send(Command.BYPASS_OFF)
 
     def filter_step_up_1(self) -> None:
-        self.__serial_manager._send_command(Command.FILTER_STEP_UP, "1")
+        self._send(Command.FILTER_STEP_UP, "1")
 
     def filter_step_up_10(self) -> None:
-        self.__serial_manager._send_command(Command.FILTER_STEP_UP, "10")
+        self._send(Command.FILTER_STEP_UP, "10")
 
     def filter_step_down_1(self) -> None:
-        self.__serial_manager._send_command(Command.FILTER_STEP_DOWN, "1")
+        self._send(Command.FILTER_STEP_DOWN, "1")
 
     def filter_step_down_10(self) -> None:
-        self.__serial_manager._send_command(Command.FILTER_STEP_DOWN, "10")
+        self._send(Command.FILTER_STEP_DOWN, "10")
+
+    def filter_step(self, steps: int) -> None:
+        """Move the filter by any number of steps, positive values increase the filter frequency."""
+        if steps > 0:
+            self._send(Command.FILTER_STEP_UP, str(steps))
+        elif steps < 0:
+            self._send(Command.FILTER_STEP_DOWN, str(-steps))
 
     def reset_filter(self) -> None:
-        self.__serial_manager._send_command(Command.FILTER_STEP_RESET)
+        self._send(Command.FILTER_STEP_RESET)
 
     def set_mode_tx_on(self) -> None:
-        self.__serial_manager._send_command(Command.MODE_TX_ON)
+        self._send(Command.MODE_TX_ON)
 
     def set_mode_tx_off(self) -> None:
-        self.__serial_manager._send_command(Command.MODE_TX_OFF)
-
-    def get_status(self) -> str:
-        self.__serial_manager._send_command(Command.GET_STATUS)
-        response = self.__serial_manager._read_from_serial()
-        if not response.startswith("STST"):
-            logging.error("Bad message received for get_status request")
-            raise BadSerialResponseException("Bad response for get_status request")
-        return response
+        self._send(Command.MODE_TX_OFF)
+
+    def get_status(self) -> StatusFrame:
+        """Return the device status, concurrent callers share a single device query.
+
+        A status younger than ``status_ttl`` seconds is returned without querying the device.
+        """
+        return self.__status_cache.get()
+
+    def _query_status(self) -> StatusFrame:
+        with self.__io_lock:
+            # queued commands are written in the same batch, ahead of the status request
+            if self.__command_queue is not None:
+                self.__command_queue.flush()
+            response = self.__serial_manager._request_status()
+            try:
+                frame = parse_status_frame(response)
+            except BadSerialResponseException:
+                logger.error("Bad message received for get_status request")
+                self.__serial_manager.metrics.bad_responses += 1
+                raise
+        if self.__serial_manager.recorder is not None:
+            self.__serial_manager.recorder.record_status(frame)
+        if self.calibration is not None:
+            self.calibration.observe(frame)
+        return frame
+
+    def start_tune(self, frequency_mhz: float) -> int:
+        """Start moving the filter to a frequency in a single relative move, without waiting for it to stop.
+
+        Args:
+            frequency_mhz (float): target frequency in MHz.
+
+        Raises:
+            CalibrationError: if there is no calibration table or it holds too little data.
+            BadSerialResponseException: if the device does not report the stepper position.
+
+        Returns:
+            int: the stepper position the filter moves to.
+        """
+        if self.calibration is None:
+            raise CalibrationError("No calibration table configured")
+        target = self.calibration.position_for(frequency_mhz)
+        frame = self.get_status()
+        if frame.position is None:
+            raise BadSerialResponseException("Device did not report the stepper position")
+        # filter steps up (towards higher frequencies) decrease the stepper position
+        self.filter_step(frame.position - target)
+        logger.info("Tuning to %s MHz: stepper %s -> %s", frequency_mhz, frame.position, target)
+        return target
+
+    def tune_to(self, frequency_mhz: float, settle_timeout: float = 30.0, poll_interval: float = 0.1) -> StatusFrame:
+        """Move the filter to a frequency using the calibration table and wait until the stepper stopped.
+
+        Args:
+            frequency_mhz (float): target frequency in MHz.
+            settle_timeout (float): maximum time in seconds to wait for the stepper to stop.
+            poll_interval (float): delay in seconds between status checks while the stepper moves.
+
+        Raises:
+            CalibrationError: if there is no calibration table or it holds too little data.
+            BadSerialResponseException: if the stepper is still moving after ``settle_timeout``.
+
+        Returns:
+            StatusFrame: the status after the move.
+        """
+        self.start_tune(frequency_mhz)
+        deadline = perf_counter() + settle_timeout
+        while (frame := self.get_status()).moving:
+            if perf_counter() > deadline:
+                raise BadSerialResponseException("Filter did not settle in time")
+            sleep(poll_interval)
+        return frame
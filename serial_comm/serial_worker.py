@@ -0,0 +1,116 @@
+import logging
+import queue
+import threading
+from typing import Any, Callable
+
+from serial import SerialException
+
+from .calibration import CalibrationError, CalibrationTable
+from .metrics import SerialMetrics
+from .serial_comm import BadSerialResponseException, SerialCommander
+from .telemetry import TelemetryRecorder
+
+logger = logging.getLogger(__name__)
+
+ResultCallback = Callable[[str, Any], None]
+ErrorCallback = Callable[[str, Exception], None]
+
+
+class SerialWorker(threading.Thread):
+    """Dedicated I/O thread owning the serial connection of a single device.
+
+    Operations are names of ``SerialCommander`` methods (e.g. ``"set_bypass_on"``). They are queued by
+    ``submit`` and executed in order on the worker thread, so the caller never blocks on serial I/O.
+    Results and errors are handed to the given callbacks *on the worker thread*; GUI users are expected
+    to marshal them back with ``wx.CallAfter``.
+
+    Commands arriving within ``coalesce_window`` seconds of each other are merged before being written
+    (see ``CoalescingCommandQueue``), set it to 0 to write every command immediately. If a ``recorder`` is
+    given every sent command and received status frame is appended to the telemetry log.
+    """
+
+    def __init__(
+        self,
+        port: str,
+        baudrate: int = 9600,
+        on_result: ResultCallback | None = None,
+        on_error: ErrorCallback | None = None,
+        coalesce_window: float = 0.05,
+        recorder: TelemetryRecorder | None = None,
+        metrics: SerialMetrics | None = None,
+        calibration: CalibrationTable | None = None,
+    ) -> None:
+        threading.Thread.__init__(self, name=f"SerialWorker[{port}]", daemon=True)
+        self._port = port
+        self._baudrate = baudrate
+        self._on_result = on_result
+        self._on_error = on_error
+        self._coalesce_window = coalesce_window
+        self._recorder = recorder
+        self.metrics = metrics if metrics is not None else SerialMetrics()
+        self._calibration = calibration
+        self._jobs: queue.Queue = queue.Queue()
+
+    @property
+    def port(self) -> str:
+        return self._port
+
+    def submit(self, operation: str, *args) -> None:
+        """Queue a ``SerialCommander`` operation, returns immediately.
+
+        Args:
+            operation (str): name of the ``SerialCommander`` method to call.
+            *args: positional arguments passed to the method.
+        """
+        if not hasattr(SerialCommander, operation):
+            raise ValueError(f"Unknown serial operation: {operation}")
+        self._jobs.put((operation, args))
+
+    def pending(self) -> int:
+        """Return the approximate number of operations waiting to be executed."""
+        return self._jobs.qsize()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Ask the worker to finish the queued operations, close the port and exit."""
+        self._jobs.put(None)
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+    def _execute(self, serial_commander: SerialCommander, operation: str, args: tuple = ()) -> None:
+        try:
+            result = getattr(serial_commander, operation)(*args)
+        except (SerialException, BadSerialResponseException, CalibrationError) as ex:
+            logger.error("Serial operation %s on %s failed: %s", operation, self._port, ex)
+            if self._on_error is not None:
+                self._on_error(operation, ex)
+        else:
+            if self._on_result is not None:
+                self._on_result(operation, result)
+
+    def run(self) -> None:
+        serial_commander = SerialCommander(
+            self._port,
+            self._baudrate,
+            coalesce=self._coalesce_window > 0,
+            recorder=self._recorder,
+            metrics=self.metrics,
+            calibration=self._calibration,
+        )
+        try:
+            while True:
+                try:
+                    # while commands are held back wait at most the coalescing window for more of them
+                    job = self._jobs.get(
+                        timeout=self._coalesce_window if serial_commander.has_pending_commands() else None
+                    )
+                except queue.Empty:
+                    self._execute(serial_commander, "flush_commands")
+                    continue
+                if job is None:
+                    break
+                self._execute(serial_commander, *job)
+            if serial_commander.has_pending_commands():
+                self._execute(serial_commander, "flush_commands")
+        finally:
+            logger.debug("Saved %d serial writes on %s", serial_commander.saved_writes, self._port)
+            serial_commander.close()
@@ -0,0 +1,83 @@
+import threading
+import time
+from typing import Callable
+
+from .protocol import StatusFrame
+
+
+class _Call:
+    """A device query in flight, shared by every caller that arrives while it runs."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.frame: StatusFrame | None = None
+        self.error: BaseException | None = None
+
+
+class StatusCache:
+    """Single-flight status cache with a time to live.
+
+    Concurrent ``get`` calls share one device query; a frame younger than ``ttl`` seconds is returned
+    without querying the device at all. ``invalidate`` must be called whenever a command changes the
+    device state, afterwards the next ``get`` always queries the device again.
+
+    Args:
+        fetch (Callable[[], StatusFrame]): performs the actual device query.
+        ttl (float): freshness window in seconds, 0 only shares queries that are in flight.
+        clock (Callable[[], float]): monotonic time source.
+    """
+
+    def __init__(
+        self, fetch: Callable[[], StatusFrame], ttl: float = 0.0, clock: Callable[[], float] = time.monotonic
+    ):
+        self._fetch = fetch
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._frame: StatusFrame | None = None
+        self._fetched_at = 0.0
+        self._generation = 0
+        self._in_flight: _Call | None = None
+        self.queries = 0
+        self.hits = 0
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._frame = None
+            self._generation += 1
+            # a query already in flight may predate the change, later callers must not join it
+            self._in_flight = None
+
+    def get(self) -> StatusFrame:
+        with self._lock:
+            if self._frame is not None and self._clock() - self._fetched_at < self.ttl:
+                self.hits += 1
+                return self._frame
+            call = self._in_flight
+            if call is None:
+                call = self._in_flight = _Call()
+                generation = self._generation
+                self.queries += 1
+            else:
+                self.hits += 1
+                generation = None
+        if generation is None:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.frame
+
+        try:
+            call.frame = self._fetch()
+            return call.frame
+        except BaseException as ex:
+            call.error = ex
+            raise
+        finally:
+            with self._lock:
+                if self._in_flight is call:
+                    self._in_flight = None
+                if call.error is None and generation == self._generation:
+                    self._frame = call.frame
+                    self._fetched_at = self._clock()
+            call.done.set()
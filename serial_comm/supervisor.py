@@ -0,0 +1,231 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+import time
+from enum import Enum
+from typing import Callable
+
+from serial.tools import list_ports
+
+from .serial_comm import _device_key
+
+logger = logging.getLogger(__name__)
+
+# from <sys/inotify.h>
+IN_ATTRIB = 0x004
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+# operations replayed after a reconnect, only the last one of each group matters
+_REPLAYED_OPERATIONS = {
+    "set_bypass_on": "bypass",
+    "set_bypass_off": "bypass",
+    "set_mode_tx_on": "tx_mode",
+    "set_mode_tx_off": "tx_mode",
+}
+
+
+class ConnectionState(str, Enum):
+    CONNECTING = "connecting"
+    CONNECTED = "connected"
+    DISCONNECTED = "disconnected"
+
+
+StateCallback = Callable[[ConnectionState, str], None]
+
+
+class _DevWatch:
+    """inotify watch of the device nodes in ``/dev``, available on Linux without a udev daemon."""
+
+    def __init__(self, directory: str = "/dev") -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, directory.encode(), IN_CREATE | IN_DELETE | IN_ATTRIB) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch on {directory} failed")
+
+    def read_names(self) -> list[str]:
+        """Return the names of the nodes changed since the last call."""
+        try:
+            data = os.read(self.fd, 4096)
+        except BlockingIOError:
+            return []
+        names = []
+        offset = 0
+        while offset < len(data):
+            _, _, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+            offset += _INOTIFY_EVENT.size
+            names.append(data[offset : offset + length].rstrip(b"\0").decode(errors="replace"))
+            offset += length
+        return names
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class ConnectionSupervisor(threading.Thread):
+    """Watches the port of a controller and tells when to connect again after the link was lost.
+
+    The device is identified by its USB VID/PID/serial number (see ``get_com_ports``), so an adapter that
+    comes back under another ``/dev/ttyUSB*`` name is found as well; ports without USB information are
+    matched by path. Hot-plugging is noticed through inotify on ``/dev``, where inotify is not available
+    the ports are rescanned every ``rescan_interval`` seconds.
+
+    ``on_state`` is called *on the supervisor thread* with the new state and port:
+
+    * ``DISCONNECTED``: the device vanished while connected,
+    * ``CONNECTING``: the device is present again, the owner should open the given port and report the
+      outcome with ``connection_established`` or ``connection_lost``.
+
+    A device that is present but fails to open is retried with exponential back-off, starting at
+    ``retry_interval`` seconds, e.g. while udev has not yet fixed the permissions of a new node.
+    """
+
+    def __init__(
+        self,
+        port: str,
+        on_state: StateCallback,
+        retry_interval: float = 0.1,
+        max_retry_interval: float = 5.0,
+        rescan_interval: float = 1.0,
+    ) -> None:
+        threading.Thread.__init__(self, name=f"ConnectionSupervisor[{port}]", daemon=True)
+        self._port = port
+        self._device_key = next((_device_key(p) for p in list_ports.comports() if p.device == port), None)
+        self._on_state = on_state
+        self._retry_interval = retry_interval
+        self._max_retry_interval = max_retry_interval
+        self._rescan_interval = rescan_interval
+        self._state = ConnectionState.CONNECTING
+        self._next_interval = retry_interval
+        self._retry_at: float | None = None
+        self._present = True
+        self._desired: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        self._running = True
+
+    @property
+    def port(self) -> str:
+        """Path of the device, may change when the adapter is plugged in again."""
+        return self._port
+
+    @property
+    def state(self) -> ConnectionState:
+        return self._state
+
+    def remember(self, operation: str) -> None:
+        """Record a bypass or TX mode operation as the state to restore after a reconnect."""
+        if operation in _REPLAYED_OPERATIONS:
+            with self._lock:
+                self._desired[_REPLAYED_OPERATIONS[operation]] = operation
+
+    def replay_operations(self) -> list[str]:
+        """Return the ``SerialCommander`` operations restoring the last desired bypass and TX mode."""
+        with self._lock:
+            return list(self._desired.values())
+
+    def connection_established(self) -> None:
+        with self._lock:
+            self._state = ConnectionState.CONNECTED
+            self._next_interval = self._retry_interval
+            self._retry_at = None
+
+    def connection_lost(self) -> None:
+        """Report a failed I/O or open, the port is retried once the device is present."""
+        with self._lock:
+            if self._state is ConnectionState.DISCONNECTED:
+                return
+            self._state = ConnectionState.DISCONNECTED
+            self._retry_at = time.monotonic() + self._next_interval
+            self._next_interval = min(self._next_interval * 2, self._max_retry_interval)
+        self._wakeup()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._running = False
+        self._wakeup()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+    def _wakeup(self) -> None:
+        with self._lock:
+            # the pipe is closed when the thread ends, its descriptors may already be reused
+            if self._wakeup_w is not None:
+                os.write(self._wakeup_w, b"\0")
+
+    def _find_port(self) -> str | None:
+        """Return the current path of the supervised device, None if it is not plugged in."""
+        if self._device_key is None:
+            return self._port if os.path.exists(self._port) else None
+        for port_info in list_ports.comports():
+            if _device_key(port_info) == self._device_key:
+                return port_info.device
+        return None
+
+    def _check(self) -> None:
+        port = self._find_port()
+        with self._lock:
+            self._present = port is not None
+            state = self._state
+            if state is ConnectionState.CONNECTED and port is None:
+                self._state = ConnectionState.DISCONNECTED
+                # reopen at once when it comes back
+                self._retry_at = time.monotonic()
+            elif (
+                state is ConnectionState.DISCONNECTED
+                and port is not None
+                and self._retry_at is not None
+                and time.monotonic() >= self._retry_at
+            ):
+                self._state = ConnectionState.CONNECTING
+                self._port = port
+                self._retry_at = None
+            else:
+                return
+            new_state = self._state
+        logger.info("%s is %s", self._port, new_state.value)
+        self._on_state(new_state, self._port)
+
+    def _timeout(self, watch: _DevWatch | None) -> float | None:
+        with self._lock:
+            # an absent device is not retried on a timer, a rescan tells when it is back
+            retry_at = self._retry_at if self._state is ConnectionState.DISCONNECTED and self._present else None
+        if retry_at is not None:
+            timeout = max(0.0, retry_at - time.monotonic())
+            return timeout if watch is not None else min(timeout, self._rescan_interval)
+        return None if watch is not None else self._rescan_interval
+
+    def run(self) -> None:
+        try:
+            watch = _DevWatch()
+        except (OSError, AttributeError) as ex:
+            # not Linux or no inotify, fall back to polling the port list
+            logger.debug("inotify not available, polling serial ports: %s", ex)
+            watch = None
+        readers = [self._wakeup_r] if watch is None else [self._wakeup_r, watch.fd]
+        try:
+            while self._running:
+                ready, _, _ = select.select(readers, [], [], self._timeout(watch))
+                if self._wakeup_r in ready:
+                    os.read(self._wakeup_r, 4096)
+                if watch is not None and watch.fd in ready:
+                    if not any(name.startswith("tty") for name in watch.read_names()):
+                        continue
+                    logger.debug("Serial device nodes changed")
+                if self._running:
+                    self._check()
+        finally:
+            if watch is not None:
+                watch.close()
+            with self._lock:
+                os.close(self._wakeup_r)
+                os.close(self._wakeup_w)
+                self._wakeup_w = None
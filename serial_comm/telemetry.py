@@ -0,0 +1,265 @@
+"""Compact binary telemetry log of status frames and sent commands.
+
+Every file starts with a 32 byte header followed by fixed-width 16 byte little-endian records::
+
+    header: magic "GSTL", version (u16), record size (u16), wall clock ns (i64), monotonic ns (i64), padding
+    record: monotonic ns (i64), kind (u8), flags (u8), frequency (i16), value (i32)
+
+Status records pack the boolean fields into ``flags`` and store the stepper position in ``value``; command
+records store the index of the ``Command`` member in ``flags`` and its numeric parameter in ``value``. The
+header anchors the monotonic timestamps to the wall clock of the moment the file was created, which is how
+``TelemetryArchive`` finds the records of a wall clock range across the files of a directory.
+"""
+
+import bisect
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Iterator, NamedTuple
+
+from .protocol import Command, StatusFrame
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"GSTL"
+VERSION = 1
+HEADER = struct.Struct("<4sHHqq8x")
+RECORD = struct.Struct("<qBBhi")
+
+KIND_STATUS = 0
+KIND_COMMAND = 1
+
+_BYPASS = 0x01
+_MOVING = 0x02
+_TX_MODE = 0x04
+_HAS_FREQUENCY = 0x08
+_HAS_POSITION = 0x10
+
+_COMMANDS = list(Command)
+_COMMAND_INDEX = {command: index for index, command in enumerate(_COMMANDS)}
+
+
+class TelemetryRecord(NamedTuple):
+    timestamp_ns: int
+    status: StatusFrame | None = None
+    command: Command | None = None
+    parameter: int = 0
+
+
+def _pack_status(timestamp_ns: int, frame: StatusFrame) -> bytes:
+    flags = (
+        (_BYPASS if frame.bypass else 0)
+        | (_MOVING if frame.moving else 0)
+        | (_TX_MODE if frame.tx_mode else 0)
+        | (_HAS_FREQUENCY if frame.frequency is not None else 0)
+        | (_HAS_POSITION if frame.position is not None else 0)
+    )
+    return RECORD.pack(timestamp_ns, KIND_STATUS, flags, frame.frequency or 0, frame.position or 0)
+
+
+def _unpack(timestamp_ns: int, kind: int, flags: int, frequency: int, value: int) -> TelemetryRecord:
+    if kind == KIND_COMMAND:
+        return TelemetryRecord(timestamp_ns, command=_COMMANDS[flags], parameter=value)
+    return TelemetryRecord(
+        timestamp_ns,
+        status=StatusFrame(
+            frequency if flags & _HAS_FREQUENCY else None,
+            value if flags & _HAS_POSITION else None,
+            bool(flags & _BYPASS),
+            bool(flags & _MOVING),
+            bool(flags & _TX_MODE),
+        ),
+    )
+
+
+class TelemetryRecorder:
+    """Appends status frames and commands to rotating telemetry files in a directory.
+
+    Args:
+        directory (str): where the ``telemetry-*.bin`` files are written.
+        max_file_size (int): size in bytes after which a new file is started.
+        max_files (int | None): number of files to keep, the oldest ones are deleted; None keeps all.
+    """
+
+    def __init__(self, directory: str, max_file_size: int = 64 * 1024 * 1024, max_files: int | None = None) -> None:
+        self._directory = directory
+        self._max_file_size = max_file_size
+        self._max_files = max_files
+        self._lock = threading.Lock()
+        self._file = None
+        self._size = 0
+        self._closed = False
+        os.makedirs(directory, exist_ok=True)
+
+    def _open_file(self) -> None:
+        wall_clock_ns = time.time_ns()
+        name = time.strftime("telemetry-%Y%m%dT%H%M%S", time.gmtime(wall_clock_ns // 10**9))
+        # microseconds keep the names unique and in chronological order
+        path = os.path.join(self._directory, f"{name}_{wall_clock_ns // 1000 % 10**6:06d}.bin")
+        self._file = open(path, "wb")  # pylint: disable=consider-using-with
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, wall_clock_ns, time.monotonic_ns()))
+        self._size = HEADER.size
+        logger.debug("Recording telemetry to %s", path)
+        if self._max_files is not None:
+            for old_path in list_telemetry_files(self._directory)[: -self._max_files]:
+                os.remove(old_path)
+
+    def _append(self, record: bytes) -> None:
+        with self._lock:
+            if self._closed:
+                # e.g. a last status from the worker thread during shutdown, must not start a new file
+                return
+            if self._file is None or self._size + len(record) > self._max_file_size:
+                self._close_file()
+                self._open_file()
+            self._file.write(record)
+            self._size += len(record)
+
+    def record_status(self, frame: StatusFrame) -> None:
+        self._append(_pack_status(time.monotonic_ns(), frame))
+
+    def record_command(self, command: Command, parameter: str = "") -> None:
+        value = int(parameter) if parameter else 0
+        self._append(RECORD.pack(time.monotonic_ns(), KIND_COMMAND, _COMMAND_INDEX[command], 0, value))
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self) -> None:
+        """Close the current file, later records are discarded."""
+        with self._lock:
+            self._closed = True
+            self._close_file()
+
+
+class TelemetryReader:
+    """Memory-mapped, random access view of a single telemetry file.
+
+    Records are decoded on access only, so arbitrarily large files can be scanned or sliced without
+    loading them into memory. Supports ``len``, indexing, slicing and iteration.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as telemetry_file:
+            # mmap cannot map an empty file, e.g. one whose header never got flushed
+            if os.fstat(telemetry_file.fileno()).st_size < HEADER.size:
+                raise ValueError(f"{path} is too short for a telemetry file")
+            self._mmap = mmap.mmap(telemetry_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, self.wall_clock_ns, self.monotonic_ns = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a telemetry file of version {VERSION}")
+        # a partially written last record (e.g. after a crash) is ignored
+        self._count = (len(self._mmap) - HEADER.size) // RECORD.size
+
+    def __enter__(self) -> "TelemetryReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int | slice) -> TelemetryRecord | list[TelemetryRecord]:
+        if isinstance(index, slice):
+            return list(self.iter_records(*index.indices(self._count)[:2]))
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("telemetry record index out of range")
+        return _unpack(*RECORD.unpack_from(self._mmap, HEADER.size + index * RECORD.size))
+
+    def __iter__(self) -> Iterator[TelemetryRecord]:
+        return self.iter_records()
+
+    def iter_records(self, start: int = 0, stop: int | None = None) -> Iterator[TelemetryRecord]:
+        stop = self._count if stop is None else min(stop, self._count)
+        if start >= stop:
+            return
+        view = memoryview(self._mmap)[HEADER.size + start * RECORD.size : HEADER.size + stop * RECORD.size]
+        try:
+            for fields in RECORD.iter_unpack(view):
+                yield _unpack(*fields)
+        finally:
+            view.release()
+
+    def timestamp_ns(self, index: int) -> int:
+        return struct.unpack_from("<q", self._mmap, HEADER.size + index * RECORD.size)[0]
+
+    def index_at(self, timestamp_ns: int) -> int:
+        """Return the index of the first record not older than the given monotonic timestamp."""
+        return bisect.bisect_left(range(self._count), timestamp_ns, key=self.timestamp_ns)
+
+    def between(self, start_ns: int, end_ns: int) -> Iterator[TelemetryRecord]:
+        """Iterate over the records with ``start_ns <= timestamp < end_ns`` (monotonic nanoseconds)."""
+        return self.iter_records(self.index_at(start_ns), self.index_at(end_ns))
+
+    def to_wall_clock_ns(self, timestamp_ns: int) -> int:
+        """Convert a monotonic record timestamp to wall clock nanoseconds since the epoch."""
+        return self.wall_clock_ns + timestamp_ns - self.monotonic_ns
+
+
+def list_telemetry_files(directory: str) -> list[str]:
+    """Return the telemetry files of a directory, oldest first."""
+    names = sorted(name for name in os.listdir(directory) if name.startswith("telemetry-") and name.endswith(".bin"))
+    return [os.path.join(directory, name) for name in names]
+
+
+class TelemetryArchive:
+    """Wall clock view of all telemetry files of a directory, e.g. to extract the records of a pass.
+
+    Every file is mapped by a ``TelemetryReader``; files that cannot be read (empty, truncated header,
+    another version) are skipped with a warning. Monotonic timestamps are only comparable within a file,
+    across a reboot they start over, so each file is converted through its own header anchor and the
+    records yielded here carry wall clock nanoseconds since the epoch in ``timestamp_ns``.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.readers: list[TelemetryReader] = []
+        for path in list_telemetry_files(directory):
+            try:
+                self.readers.append(TelemetryReader(path))
+            except (OSError, ValueError) as ex:
+                logger.warning("Skipping telemetry file %s: %s", path, ex)
+
+    def __enter__(self) -> "TelemetryArchive":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for reader in self.readers:
+            reader.close()
+        self.readers = []
+
+    def __len__(self) -> int:
+        return sum(len(reader) for reader in self.readers)
+
+    def between(self, start_ns: int, end_ns: int) -> Iterator[TelemetryRecord]:
+        """Iterate over the records with ``start_ns <= wall clock time < end_ns`` (nanoseconds since the epoch)."""
+        for reader in self.readers:
+            if not len(reader):
+                continue
+            offset = reader.wall_clock_ns - reader.monotonic_ns
+            # files covering none of the range are skipped without a search
+            if reader.timestamp_ns(len(reader) - 1) + offset < start_ns or reader.timestamp_ns(0) + offset >= end_ns:
+                continue
+            for record in reader.between(start_ns - offset, end_ns - offset):
+                yield record._replace(timestamp_ns=record.timestamp_ns + offset)
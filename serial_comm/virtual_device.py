@@ -0,0 +1,243 @@
+"""Simulated GS filter controller on a pseudo-terminal, for testing and benchmarking without hardware.
+
+Run ``python -m serial_comm.virtual_device`` and point the GUI at the printed port (e.g. by adding it to
+``GS_EXTRA_PORTS``).
+"""
+
+import argparse
+import heapq
+import logging
+import os
+import random
+import selectors
+import threading
+import time
+import tty
+
+from .protocol import Command
+
+logger = logging.getLogger(__name__)
+
+MAX_POSITION = 2000
+
+
+class VirtualDevice:
+    """Simulated filter controller speaking the serial protocol on a pty.
+
+    Args:
+        latency (float): delay in seconds before a status reply is sent.
+        jitter (float): maximum random extra delay in seconds added to ``latency``.
+        drop_rate (float): probability of a status reply not being sent at all.
+        garble_rate (float): probability of a status reply being corrupted.
+        step_time (float): time in seconds the simulated stepper needs for a single step.
+        base_frequency (float): filter frequency in MHz at stepper position 0.
+        mhz_per_step (float): frequency decrease in MHz per stepper step.
+        seed (int | None): seed of the random generator used for jitter and faults.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        drop_rate: float = 0.0,
+        garble_rate: float = 0.0,
+        step_time: float = 0.0,
+        base_frequency: float = 470.0,
+        mhz_per_step: float = 0.05,
+        seed: int | None = None,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.garble_rate = garble_rate
+        self.step_time = step_time
+        self.base_frequency = base_frequency
+        self.mhz_per_step = mhz_per_step
+        self.bypass = False
+        self.tx_mode = False
+        self.received_lines = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        # stepper motion: moves from _start_position towards _target_position starting at _motion_start
+        self._start_position = 0
+        self._target_position = 0
+        self._motion_start = 0.0
+        self._master_fd: int | None = None
+        self._slave_fd: int | None = None
+        self._port: str | None = None
+        self._wakeup_r, self._wakeup_w = None, None
+        self._thread: threading.Thread | None = None
+        self._running = False
+
+    def __enter__(self) -> "VirtualDevice":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    @property
+    def port(self) -> str | None:
+        """Path of the pseudo-terminal to open, None until started."""
+        return self._port
+
+    def start(self) -> str:
+        """Open the pseudo-terminal and start answering, returns the port path."""
+        self._master_fd, self._slave_fd = os.openpty()
+        # no echo and no newline translation, like a real serial line
+        tty.setraw(self._slave_fd)
+        os.set_blocking(self._master_fd, False)
+        self._port = os.ttyname(self._slave_fd)
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"VirtualDevice[{self._port}]", daemon=True)
+        self._thread.start()
+        logger.debug("Virtual device listening on %s", self._port)
+        return self._port
+
+    def stop(self) -> None:
+        if not self._running:
+            return
+        self._running = False
+        os.write(self._wakeup_w, b"\0")
+        self._thread.join()
+        for fd in (self._master_fd, self._slave_fd, self._wakeup_r, self._wakeup_w):
+            os.close(fd)
+
+    def position(self, now: float | None = None) -> int:
+        """Current simulated stepper position."""
+        with self._lock:
+            return self._position(time.monotonic() if now is None else now)
+
+    def _position(self, now: float) -> int:
+        distance = self._target_position - self._start_position
+        if self.step_time <= 0 or distance == 0:
+            return self._target_position
+        done = int((now - self._motion_start) / self.step_time)
+        if done >= abs(distance):
+            return self._target_position
+        return self._start_position + (done if distance > 0 else -done)
+
+    def _move_to(self, target: int, now: float) -> None:
+        self._start_position = self._position(now)
+        self._target_position = max(0, min(MAX_POSITION, target))
+        self._motion_start = now
+
+    def frequency(self, position: int) -> int:
+        return round(self.base_frequency - position * self.mhz_per_step)
+
+    def status_line(self, now: float | None = None) -> bytes:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            position = self._position(now)
+            moving = position != self._target_position
+            return (
+                f"STST,{self.frequency(position)},{position},{int(self.bypass)},{int(moving)},{int(self.tx_mode)}\r\n"
+            ).encode("UTF-8")
+
+    def handle_line(self, line: str, now: float) -> bool:
+        """Apply a received command, returns True if it asks for a status reply."""
+        self.received_lines += 1
+        with self._lock:
+            if line == Command.GET_STATUS.value:
+                return True
+            if line == Command.BYPASS_ON.value:
+                self.bypass = True
+            elif line == Command.BYPASS_OFF.value:
+                self.bypass = False
+            elif line == Command.MODE_TX_ON.value:
+                self.tx_mode = True
+            elif line == Command.MODE_TX_OFF.value:
+                self.tx_mode = False
+            elif line == Command.FILTER_STEP_RESET.value:
+                self._move_to(0, now)
+            elif (
+                line.startswith((Command.FILTER_STEP_DOWN.value, Command.FILTER_STEP_UP.value)) and line[3:].isdigit()
+            ):
+                steps = int(line[3:])
+                # FILTER_STEP_DOWN ("ST+") increases the step count
+                direction = 1 if line.startswith(Command.FILTER_STEP_DOWN.value) else -1
+                self._move_to(self._target_position + direction * steps, now)
+            else:
+                logger.debug("Virtual device ignores unknown command: %s", line)
+        return False
+
+    def _reply(self, line: bytes) -> bytes | None:
+        if self._random.random() < self.drop_rate:
+            return None
+        if self._random.random() < self.garble_rate:
+            data = bytearray(line[:-2])
+            for _ in range(self._random.randint(1, 3)):
+                data[self._random.randrange(len(data))] = self._random.randrange(33, 127)
+            if self._random.random() < 0.5:
+                del data[self._random.randrange(len(data)) :]
+            return bytes(data) + b"\r\n"
+        return line
+
+    def _run(self) -> None:
+        selector = selectors.DefaultSelector()
+        selector.register(self._master_fd, selectors.EVENT_READ)
+        selector.register(self._wakeup_r, selectors.EVENT_READ)
+        buffer = bytearray()
+        # heap of (due time, sequence) of pending status replies, sequence keeps equal due times in order
+        replies: list[tuple[float, int]] = []
+        sequence = 0
+        while self._running:
+            timeout = max(0.0, replies[0][0] - time.monotonic()) if replies else None
+            for key, _ in selector.select(timeout):
+                if key.fd != self._master_fd:
+                    continue
+                try:
+                    buffer += os.read(self._master_fd, 4096)
+                except (BlockingIOError, OSError):
+                    continue
+                while (end := buffer.find(b"\n")) != -1:
+                    line = buffer[:end].rstrip(b"\r").decode("UTF-8", errors="replace")
+                    del buffer[: end + 1]
+                    now = time.monotonic()
+                    if self.handle_line(line, now):
+                        due = now + self.latency + self._random.uniform(0, self.jitter)
+                        heapq.heappush(replies, (due, sequence))
+                        sequence += 1
+            now = time.monotonic()
+            while replies and replies[0][0] <= now:
+                heapq.heappop(replies)
+                # the status is sampled when the reply is sent, as the firmware would do
+                if (reply := self._reply(self.status_line(now))) is not None:
+                    try:
+                        os.write(self._master_fd, reply)
+                    except OSError as ex:
+                        logger.debug("Virtual device could not reply: %s", ex)
+        selector.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulated GS filter controller on a pseudo-terminal")
+    parser.add_argument("--latency", type=float, default=0.01, help="status reply latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="maximum extra random latency in seconds")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="probability of a dropped reply")
+    parser.add_argument("--garble-rate", type=float, default=0.0, help="probability of a garbled reply")
+    parser.add_argument("--step-time", type=float, default=0.002, help="stepper time per step in seconds")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    args = parser.parse_args()
+
+    device = VirtualDevice(
+        latency=args.latency,
+        jitter=args.jitter,
+        drop_rate=args.drop_rate,
+        garble_rate=args.garble_rate,
+        step_time=args.step_time,
+        seed=args.seed,
+    )
+    print(device.start(), flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        device.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import asyncio
+
+from serial_comm.async_serial_comm import AsyncSerialManager
+from serial_comm.virtual_device import VirtualDevice
+
+
+async def _poll(manager: AsyncSerialManager, timeout: float) -> bool:
+    try:
+        await manager._request_status(timeout)
+    except asyncio.TimeoutError:
+        return False
+    return True
+
+
+def test_late_reply_does_not_answer_next_request():
+    async def run():
+        with VirtualDevice(latency=0.15) as device:
+            manager = AsyncSerialManager(device.port)
+            try:
+                assert not await _poll(manager, 0.1)
+                device.latency = 0.0
+                assert await _poll(manager, 1.0)
+                assert manager.late_replies == 1
+                assert await _poll(manager, 1.0)
+            finally:
+                manager.close()
+
+    asyncio.run(run())
+
+
+def test_recovers_after_outage():
+    async def run():
+        with VirtualDevice(latency=0.01) as device:
+            manager = AsyncSerialManager(device.port)
+            try:
+                device.drop_rate = 1.0
+                outcomes = [await _poll(manager, 0.05) for _ in range(10)]
+                assert not any(outcomes)
+                device.drop_rate = 0.0
+                outcomes = [await _poll(manager, 0.05) for _ in range(10)]
+                # at most the one request whose reply went to the last lost request fails
+                assert outcomes.count(False) <= 1
+                assert all(outcomes[-8:])
+                assert len(manager._status_waiters) == 0
+            finally:
+                manager.close()
+
+    asyncio.run(run())
@@ -0,0 +1,111 @@
+import logging
+
+import wx
+from pubsub import pub
+
+from serial_comm import Command, DeviceManager, PollConfig, StatusFrame
+
+from .history_panel import HistoryPanel
+from .main_window import ControllsPanel, FrequencyPanel
+from .view_model import StatusViewModel
+
+logger = logging.getLogger(__name__)
+
+STEP_COMMANDS = {
+    -10: (Command.FILTER_STEP_DOWN, "10"),
+    -1: (Command.FILTER_STEP_DOWN, "1"),
+    1: (Command.FILTER_STEP_UP, "1"),
+    10: (Command.FILTER_STEP_UP, "10"),
+}
+
+
+class MultiDeviceWindow(wx.Frame):
+    """Window with one panel per filter controller, all driven by a single ``DeviceManager``."""
+
+    def __init__(self, parent, title: str, ports: list[str]) -> None:
+        wx.Frame.__init__(self, parent, title=title)
+        self.deviceManager = DeviceManager(
+            ports, poll_config=PollConfig.from_env(), on_status=self._PostStatus, on_error=self._PostError
+        )
+        self.Bind(wx.EVT_CLOSE, self.OnClose)
+
+        self.statusBar = self.CreateStatusBar()
+        self.main_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        self.devicePanels: dict[str, DevicePanel] = {}
+        for index, port in enumerate(ports):
+            devicePanel = DevicePanel(self, port, f"device{index}_", self.deviceManager)
+            self.devicePanels[port] = devicePanel
+            self.main_sizer.Add(devicePanel, 1, wx.EXPAND | wx.ALL, 5)
+
+        self.SetAutoLayout(1)
+        self.main_sizer.Fit(self)
+        self.main_sizer.SetSizeHints(self)
+        self.SetSizer(self.main_sizer)
+        self.deviceManager.start()
+        self.statusBar.SetStatusText(f"Using serial ports: {', '.join(ports)}")
+
+    def _PostStatus(self, port: str, frame: StatusFrame) -> None:
+        """Called on the device manager thread."""
+        wx.CallAfter(self.OnStatusReceived, port, frame)
+
+    def _PostError(self, port: str, error: Exception) -> None:
+        """Called on the device manager thread."""
+        wx.CallAfter(self.OnDeviceError, port, error)
+
+    def OnStatusReceived(self, port: str, frame: StatusFrame) -> None:
+        self.devicePanels[port].ShowStatus(frame)
+
+    def OnDeviceError(self, port: str, error: Exception) -> None:
+        self.statusBar.SetStatusText(f"{port}: {error}")
+
+    def OnClose(self, event) -> None:
+        self.deviceManager.stop(timeout=1)
+        event.Skip()
+
+
+class DevicePanel(wx.Panel):
+    """Controls and frequency display of a single device."""
+
+    def __init__(self, parent, port: str, topicPrefix: str, deviceManager: DeviceManager) -> None:
+        wx.Panel.__init__(self, parent, wx.ID_ANY, wx.DefaultPosition, wx.DefaultSize, wx.TAB_TRAVERSAL, "DevicePanel")
+        self.port = port
+        self.deviceManager = deviceManager
+        pub.subscribe(self.OnBypassMessageReceived, f"{topicPrefix}bypass")
+        pub.subscribe(self.OnFilterOffsetMessageReceived, f"{topicPrefix}filter_offset")
+        pub.subscribe(self.OnResetFilterMessageReceived, f"{topicPrefix}reset_filter")
+        pub.subscribe(self.OnForceTXMessageReceived, f"{topicPrefix}force_tx")
+
+        sizer = wx.StaticBoxSizer(wx.StaticBox(self, -1, port), wx.VERTICAL)
+        self.controllsPanel = ControllsPanel(self, topicPrefix)
+        sizer.Add(self.controllsPanel, 1, wx.EXPAND | wx.ALL, 5)
+        self.frequencyPanel = FrequencyPanel(self)
+        sizer.Add(self.frequencyPanel, 1, wx.EXPAND | wx.ALL, 5)
+        self.historyPanel = HistoryPanel(self)
+        sizer.Add(self.historyPanel, 1, wx.EXPAND | wx.ALL, 5)
+        self.statusViewModel = StatusViewModel(self.controllsPanel, self.frequencyPanel)
+
+        self.SetSizer(sizer)
+        self.SetAutoLayout(1)
+        sizer.Fit(self)
+
+    def ShowStatus(self, frame: StatusFrame) -> None:
+        self.statusViewModel.Update(frame)
+        self.historyPanel.Append(frame)
+
+    def OnBypassMessageReceived(self, message: bool) -> None:
+        self.statusViewModel.WidgetChanged("bypass", message)
+        self.deviceManager.send(self.port, Command.BYPASS_ON if message is True else Command.BYPASS_OFF)
+
+    def OnForceTXMessageReceived(self, message: bool) -> None:
+        self.statusViewModel.WidgetChanged("tx_mode", message)
+        self.deviceManager.send(self.port, Command.MODE_TX_ON if message is True else Command.MODE_TX_OFF)
+
+    def OnResetFilterMessageReceived(self, message: str) -> None:
+        self.deviceManager.send(self.port, Command.FILTER_STEP_RESET)
+
+    def OnFilterOffsetMessageReceived(self, message: str) -> None:
+        offset = int(message)
+        if offset not in STEP_COMMANDS:
+            logger.error("Unsupported filter offset: %s", message)
+            return
+        self.deviceManager.send(self.port, *STEP_COMMANDS[offset])
@@ -0,0 +1,108 @@
+import math
+import time
+
+import wx
+
+from serial_comm import StatusFrame
+
+from .status_history import BYPASS_FLAG, TX_MODE_FLAG, StatusHistory
+
+# visible time window choices, label and seconds
+HISTORY_SPANS = (("1 min", 60), ("10 min", 600), ("1 h", 3600), ("12 h", 43200))
+REFRESH_INTERVAL_MS = 500
+BAND_HEIGHT = 5
+
+
+class HistoryPanel(wx.Panel):
+    """Plot of the filter frequency and the bypass/TX state over the last minutes or hours.
+
+    Status frames are only appended to a fixed size ``StatusHistory`` when they arrive, the plot is
+    redrawn by its own timer and only if new frames arrived, so the status path stays cheap.
+    """
+
+    def __init__(self, parent, history: StatusHistory | None = None) -> None:
+        wx.Panel.__init__(
+            self, parent, wx.ID_ANY, wx.DefaultPosition, wx.DefaultSize, wx.TAB_TRAVERSAL, "HistoryPanel"
+        )
+        self.history = history if history is not None else StatusHistory()
+        self.span = HISTORY_SPANS[1][1]
+        self.changed = False
+        sizer = wx.StaticBoxSizer(wx.StaticBox(self, -1, "History"), wx.VERTICAL)
+
+        self.spanChoice = wx.Choice(self, choices=[label for label, _ in HISTORY_SPANS])
+        self.spanChoice.SetSelection(1)
+        self.spanChoice.Bind(wx.EVT_CHOICE, self.OnSpanChoice)
+        sizer.Add(self.spanChoice, 0, wx.ALIGN_RIGHT | wx.BOTTOM, 5)
+
+        self.plotPanel = wx.Panel(self, size=wx.Size(-1, 120))
+        # everything is painted in OnPlotPaint, no background erase flicker
+        self.plotPanel.SetBackgroundStyle(wx.BG_STYLE_PAINT)
+        self.plotPanel.Bind(wx.EVT_PAINT, self.OnPlotPaint)
+        self.plotPanel.Bind(wx.EVT_SIZE, lambda event: self.plotPanel.Refresh(False))
+        sizer.Add(self.plotPanel, 1, wx.EXPAND | wx.ALL)
+
+        self.refreshTimer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.OnRefreshTimer, self.refreshTimer)
+        self.Bind(wx.EVT_WINDOW_DESTROY, self.OnDestroy)
+        self.refreshTimer.Start(REFRESH_INTERVAL_MS)
+
+        self.SetSizer(sizer)
+        self.SetAutoLayout(1)
+        sizer.Fit(self)
+
+    def Append(self, frame: StatusFrame) -> None:
+        self.history.append(time.monotonic(), frame.frequency, frame.bypass, frame.tx_mode)
+        self.changed = True
+
+    def OnSpanChoice(self, event) -> None:
+        self.span = HISTORY_SPANS[self.spanChoice.GetSelection()][1]
+        self.plotPanel.Refresh(False)
+
+    def OnRefreshTimer(self, event) -> None:
+        if self.changed and self.IsShownOnScreen():
+            self.changed = False
+            self.plotPanel.Refresh(False)
+
+    def OnDestroy(self, event) -> None:
+        if event.GetEventObject() is self:
+            self.refreshTimer.Stop()
+        event.Skip()
+
+    def OnPlotPaint(self, event) -> None:
+        dc = wx.AutoBufferedPaintDC(self.plotPanel)
+        dc.SetBackground(wx.Brush(wx.Colour(38, 38, 38)))
+        dc.Clear()
+        width, height = self.plotPanel.GetClientSize()
+        end = time.monotonic()
+        minimums, maximums, flags = self.history.columns(end - self.span, end, width)
+
+        # mode bands at the bottom, bypass above TX, in the colours of the toggle buttons
+        plotHeight = height - 2 * BAND_HEIGHT - 2
+        for flag, top, colour in (
+            (BYPASS_FLAG, plotHeight + 1, wx.Colour(255, 140, 0)),
+            (TX_MODE_FLAG, plotHeight + BAND_HEIGHT + 2, wx.BLUE),
+        ):
+            dc.SetPen(wx.Pen(colour))
+            dc.DrawLineList([(x, top, x, top + BAND_HEIGHT) for x in range(width) if flags[x] & flag])
+
+        known = [value for value in minimums if not math.isnan(value)]
+        if not known or plotHeight <= 0:
+            return
+        low = min(known)
+        high = max(value for value in maximums if not math.isnan(value))
+        # keep a flat line off the panel border
+        margin = max(1.0, (high - low) * 0.1)
+        low, high = low - margin, high + margin
+        scale = (plotHeight - 1) / (high - low)
+
+        dc.SetPen(wx.Pen(wx.WHITE))
+        dc.DrawLineList(
+            [
+                (x, round((high - maximums[x]) * scale), x, round((high - minimums[x]) * scale) + 1)
+                for x in range(width)
+                if not math.isnan(minimums[x])
+            ]
+        )
+        dc.SetTextForeground(wx.LIGHT_GREY)
+        dc.DrawText(f"{high - margin:g} MHz", 2, 0)
+        dc.DrawText(f"{low + margin:g} MHz", 2, plotHeight - dc.GetCharHeight())
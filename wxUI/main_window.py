@@ -1,14 +1,45 @@
 import logging
+import os
+import threading
+import time
 
 import wx
 from pubsub import pub
 from serial import SerialException
 
-from serial_comm import BadSerialResponseException, SerialCommander, SerialManager
-
-logging.basicConfig(level=logging.DEBUG)
+from serial_comm import (
+    BadSerialResponseException,
+    CalibrationTable,
+    ConnectionState,
+    ConnectionSupervisor,
+    PollConfig,
+    PollScheduler,
+    SerialManager,
+    SerialMetrics,
+    SerialWorker,
+    StatusFrame,
+    TelemetryRecorder,
+    calibration,
+)
+
+from .history_panel import HistoryPanel
+from .view_model import StatusViewModel
+
+logger = logging.getLogger(__name__)
 
 ERROR_MESSAGE = "Please check if the correct serial port is selected."
+# set GS_TELEMETRY_DIR to an empty string to disable recording
+TELEMETRY_DIR = os.environ.get(
+    "GS_TELEMETRY_DIR", os.path.join(os.path.expanduser("~"), ".local", "share", "gs_controller", "telemetry")
+)
+# Prometheus text snapshot of the serial metrics (JSON if the name ends with .json), empty string disables it
+METRICS_FILE = os.environ.get(
+    "GS_METRICS_FILE", os.path.join(os.path.expanduser("~"), ".cache", "gs_controller", "metrics.prom")
+)
+METRICS_INTERVAL_MS = 2000
+CALIBRATION_PATH = os.environ.get("GS_CALIBRATION_FILE", calibration.CALIBRATION_PATH)
+# how long a tune may keep the stepper moving before it is reported as failed
+TUNE_SETTLE_TIMEOUT = 30.0
 
 
 class MainWindow(wx.Frame):
@@ -18,11 +49,35 @@ class MainWindow(wx.Frame):
         pub.subscribe(self.OnFilterOffsetMessageReceived, "filter_offset")
         pub.subscribe(self.OnResetFilterMessageReceived, "reset_filter")
         pub.subscribe(self.OnForceTXMessageReceived, "force_tx")
-
-        self.serialCommander: SerialCommander = None
-
+        pub.subscribe(self.OnTuneMessageReceived, "tune_to")
+        pub.subscribe(self.OnStatusReceived, "serial_status")
+        pub.subscribe(self.OnSerialError, "serial_error")
+        pub.subscribe(self.OnTuneStarted, "tune_started")
+        pub.subscribe(self.OnTuneError, "tune_error")
+        pub.subscribe(self.OnConnectionStateChanged, "connection_state")
+
+        # all serial I/O is done by the worker thread, the GUI thread only queues operations
+        self.serialWorker: SerialWorker = None
+        # reopens the port when the device comes back after being unplugged or failing
+        self.connectionSupervisor: ConnectionSupervisor = None
+        self.statusRequestPending = False
+        self.connected = False
+        # last requested frequency and (frequency, target stepper position, monotonic deadline) of the tune
+        # in progress
+        self.tuneRequested: float | None = None
+        self.tuneInProgress: tuple[float, int, float] | None = None
+        self.pollScheduler = PollScheduler(PollConfig.from_env())
+        self.telemetryRecorder = TelemetryRecorder(TELEMETRY_DIR) if TELEMETRY_DIR else None
+        self.calibration = CalibrationTable(CALIBRATION_PATH)
+        # shared by all workers, so counters and histograms survive reconnects and port changes
+        self.serialMetrics = SerialMetrics()
+
+        # one-shot timer, re-armed with the interval chosen by the poll scheduler after every poll
         self.updateStatusTimer = wx.Timer(self)
         self.Bind(wx.EVT_TIMER, self.OnTimerTick, self.updateStatusTimer)
+        self.metricsTimer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.OnMetricsTimerTick, self.metricsTimer)
+        self.Bind(wx.EVT_CLOSE, self.OnClose)
 
         # Menu configuration
         settingsMenu = wx.Menu()
@@ -33,121 +88,307 @@ class MainWindow(wx.Frame):
         self.SetMenuBar(menuBar)
 
         # Status bar config
-        self.statusBar = self.CreateStatusBar()
+        self.statusBar = self.CreateStatusBar(2)
+        self.statusBar.SetStatusWidths([-1, -1])
 
         # Layout views
         self.main_sizer = wx.BoxSizer(wx.VERTICAL)
 
         self.controllsPanel = ControllsPanel(self)
         self.main_sizer.Add(self.controllsPanel, 1, wx.EXPAND | wx.ALL, 5)
-        self.frequencyPanel = FrequencyPanel(self)
+        self.frequencyPanel = FrequencyPanel(self, tunable=True)
         self.main_sizer.Add(self.frequencyPanel, 1, wx.EXPAND | wx.ALL, 5)
+        self.historyPanel = HistoryPanel(self)
+        self.main_sizer.Add(self.historyPanel, 1, wx.EXPAND | wx.ALL, 5)
+        self.statusViewModel = StatusViewModel(self.controllsPanel, self.frequencyPanel)
 
         self.SetAutoLayout(1)
         self.main_sizer.Fit(self)
         self.main_sizer.SetSizeHints(self)
         self.SetSizer(self.main_sizer)
 
+        # port discovery can take seconds, it must not delay showing the window
+        self.discoveredPorts: list[str] | None = None
+        self.portDiscoveryRunning = False
+        self.portDialogRequested = False
+        self.StartPortDiscovery()
+
+    def StartPortDiscovery(self) -> None:
+        """Probe the serial ports on a background thread, the window stays responsive meanwhile."""
+        if self.portDiscoveryRunning:
+            return
+        self.portDiscoveryRunning = True
+        threading.Thread(
+            target=lambda: wx.CallAfter(self.OnPortsDiscovered, SerialManager.get_com_ports()),
+            name="PortDiscovery",
+            daemon=True,
+        ).start()
+
+    def OnPortsDiscovered(self, serial_ports: list[str]) -> None:
+        self.portDiscoveryRunning = False
+        self.discoveredPorts = serial_ports
+        if self.portDialogRequested:
+            self.portDialogRequested = False
+            self.ShowPortDialog(serial_ports)
+        elif self.serialWorker is None:
+            self.statusBar.SetStatusText(f"Found {len(serial_ports)} serial port(s), select one in Settings")
+
     def OnPortSettings(self, event):
-        serial_ports = SerialManager.get_com_ports()
+        if self.discoveredPorts is None:
+            # discovery still running, the dialog opens once it is done
+            self.portDialogRequested = True
+            self.statusBar.SetStatusText("Searching for serial ports...")
+            self.StartPortDiscovery()
+            return
+        serial_ports = self.discoveredPorts
+        # refresh the list in the background for the next time the dialog is opened
+        self.discoveredPorts = None
+        self.StartPortDiscovery()
+        self.ShowPortDialog(serial_ports)
+
+    def ShowPortDialog(self, serial_ports: list[str]) -> None:
         if len(serial_ports) == 0:
-            logging.error("Could not find suitable serial ports!")
+            logger.error("Could not find suitable serial ports!")
             wx.MessageBox("Could not find suitable serial ports!", "Error", wx.OK | wx.ICON_ERROR)
             return
         setPortDialog = wx.SingleChoiceDialog(self, "Please select a serial port", "Select port", serial_ports)
         if setPortDialog.ShowModal() == wx.ID_OK:
             selectedPort = setPortDialog.GetStringSelection()
+            self.updateStatusTimer.Stop()
+            self.StopConnectionSupervisor()
+            self.StartSerialWorker(selectedPort)
+            self.connectionSupervisor = ConnectionSupervisor(selectedPort, self._PostConnectionState)
+            self.connectionSupervisor.start()
+
+    def StartSerialWorker(self, port: str, replay: list[str] | None = None) -> None:
+        """Open the port on a new worker, ``replay`` operations are executed before the first status request."""
+        self.StopSerialWorker()
+        # a replaced worker still finishes its queued jobs, its callbacks name it so they can be ignored
+        worker = SerialWorker(
+            port,
+            on_result=lambda operation, result: self._PostResult(worker, operation, result),
+            on_error=lambda operation, error: self._PostError(worker, operation, error),
+            recorder=self.telemetryRecorder,
+            calibration=self.calibration,
+            metrics=self.serialMetrics,
+        )
+        self.serialWorker = worker
+        self.serialWorker.start()
+        for operation in replay or []:
+            self.serialWorker.submit(operation)
+        self.statusBar.SetStatusText(f"Connecting to serial port: {port}...")
+        self.metricsTimer.Start(METRICS_INTERVAL_MS)
+        # the first status reply confirms the device and starts the status update timer
+        self.RequestStatus()
+
+    def StopSerialWorker(self) -> None:
+        if self.serialWorker is not None:
+            # do not join, the worker may still be blocked on a read of the old port
+            self.serialWorker.stop(timeout=0)
+            self.serialWorker = None
+        self.statusRequestPending = False
+        self.connected = False
+        self.tuneInProgress = None
+        self.pollScheduler.reset()
+        self.statusViewModel.Invalidate()
+
+    def StopConnectionSupervisor(self) -> None:
+        if self.connectionSupervisor is not None:
+            self.connectionSupervisor.stop(timeout=0)
+            self.connectionSupervisor = None
+        self.StopSerialWorker()
+
+    def OnMetricsTimerTick(self, event) -> None:
+        if self.serialWorker is None:
+            return
+        self.statusBar.SetStatusText(self.serialMetrics.summary(), 1)
+        if METRICS_FILE:
             try:
-                self.serialCommander = SerialCommander(selectedPort)
-                self.serialCommander.get_status()
-            except SerialException as se:
-                logging.error("Could not find or configure the device: %s [%s]", selectedPort, se)
-                wx.MessageBox(
-                    f"Could not find or configure the device: {selectedPort}", "Error", wx.OK | wx.ICON_ERROR
+                self.serialMetrics.write_snapshot(METRICS_FILE, self.serialWorker.port)
+            except OSError as ex:
+                logger.warning("Could not write metrics snapshot: %s", ex)
+
+    def OnClose(self, event) -> None:
+        self.updateStatusTimer.Stop()
+        self.metricsTimer.Stop()
+        self.StopConnectionSupervisor()
+        if self.telemetryRecorder is not None:
+            self.telemetryRecorder.close()
+        self.calibration.save()
+        event.Skip()
+
+    @staticmethod
+    def _PostResult(worker: SerialWorker, operation: str, result) -> None:
+        """Called on the serial worker thread, forwards status replies and started tunes to the GUI thread."""
+        if operation == "get_status":
+            wx.CallAfter(pub.sendMessage, "serial_status", message=result, worker=worker)
+        elif operation == "start_tune":
+            wx.CallAfter(pub.sendMessage, "tune_started", message=result, worker=worker)
+
+    @staticmethod
+    def _PostError(worker: SerialWorker, operation: str, error: Exception) -> None:
+        """Called on the serial worker thread, forwards failures to the GUI thread."""
+        if operation == "start_tune" and not isinstance(error, SerialException):
+            # a tune that cannot start says nothing about the link, it must not back off the polling
+            wx.CallAfter(pub.sendMessage, "tune_error", message=error, worker=worker)
+        else:
+            wx.CallAfter(pub.sendMessage, "serial_error", message=error, worker=worker)
+
+    @staticmethod
+    def _PostConnectionState(state: ConnectionState, port: str) -> None:
+        """Called on the supervisor thread, forwards connection changes to the GUI thread."""
+        wx.CallAfter(pub.sendMessage, "connection_state", state=state, port=port)
+
+    def SubmitCommand(self, operation: str, *args) -> None:
+        if self.connectionSupervisor is not None:
+            self.connectionSupervisor.remember(operation)
+            if self.serialWorker is None:
+                self.statusBar.SetStatusText(
+                    f"Not connected, the change is applied when {self.connectionSupervisor.port} is back"
                 )
-            except BadSerialResponseException as bsre:
-                wx.MessageBox(f"{bsre}", "Error", wx.OK | wx.ICON_ERROR)
-            else:
-                logging.debug(f"Using serial port: {selectedPort}")
-                self.statusBar.SetStatusText(f"Using serial port: {selectedPort}")
-                # since at this point everything should be fine we can start the status update timer
-                if not self.updateStatusTimer.IsRunning():
-                    self.updateStatusTimer.Start(1000)
+                return
+        if self.serialWorker is None:
+            logger.error(ERROR_MESSAGE)
+            wx.MessageBox(ERROR_MESSAGE, "Error", wx.OK | wx.ICON_ERROR)
+            return
+        self.serialWorker.submit(operation, *args)
+        # poll fast for a while to confirm the change
+        self.pollScheduler.command_sent()
+        self.ScheduleNextPoll()
+
+    def ScheduleNextPoll(self) -> None:
+        if self.statusRequestPending:
+            # re-armed when the reply arrives
+            return
+        self.updateStatusTimer.StartOnce(max(1, round(self.pollScheduler.next_interval() * 1000)))
+
+    def RequestStatus(self) -> None:
+        # never queue more than one status request, a slow link must not build up a backlog
+        if self.serialWorker is None or self.statusRequestPending:
+            return
+        self.statusRequestPending = True
+        self.serialWorker.submit("get_status")
 
     def OnBypassMessageReceived(self, message: bool) -> None:
-        try:
-            if message is True:
-                self.serialCommander.set_bypass_on()
-            else:
-                self.serialCommander.set_bypass_off()
-        except SerialException:
-            logging.error(ERROR_MESSAGE)
-            wx.MessageBox(ERROR_MESSAGE, "Error", wx.OK | wx.ICON_ERROR)
+        self.statusViewModel.WidgetChanged("bypass", message)
+        if message is True:
+            self.SubmitCommand("set_bypass_on")
+        else:
+            self.SubmitCommand("set_bypass_off")
 
     def OnForceTXMessageReceived(self, message: bool) -> None:
-        try:
-            if message is True:
-                self.serialCommander.set_mode_tx_on()
-            else:
-                self.serialCommander.set_mode_tx_off()
-        except SerialException:
-            logging.error(ERROR_MESSAGE)
-            wx.MessageBox(ERROR_MESSAGE, "Error", wx.OK | wx.ICON_ERROR)
+        self.statusViewModel.WidgetChanged("tx_mode", message)
+        if message is True:
+            self.SubmitCommand("set_mode_tx_on")
+        else:
+            self.SubmitCommand("set_mode_tx_off")
 
     def OnResetFilterMessageReceived(self, message: str) -> None:
-        try:
-            self.serialCommander.reset_filter()
-        except SerialException:
-            logging.error(ERROR_MESSAGE)
-            wx.MessageBox(ERROR_MESSAGE, "Error", wx.OK | wx.ICON_ERROR)
+        self.SubmitCommand("reset_filter")
+
+    def OnTuneMessageReceived(self, message: float) -> None:
+        # only starts the move, the regular status polls follow it so the worker is never blocked on it
+        self.tuneRequested = message
+        self.tuneInProgress = None
+        self.statusBar.SetStatusText(f"Tuning to {message} MHz...")
+        self.SubmitCommand("start_tune", message)
+
+    def OnTuneStarted(self, message: int, worker: SerialWorker) -> None:
+        if worker is not self.serialWorker:
+            return
+        self.tuneInProgress = (self.tuneRequested, message, time.monotonic() + TUNE_SETTLE_TIMEOUT)
+
+    def OnTuneError(self, message: Exception, worker: SerialWorker) -> None:
+        if worker is not self.serialWorker:
+            return
+        self.tuneInProgress = None
+        self.statusBar.SetStatusText(f"Cannot tune: {message}")
+
+    def CheckTuneProgress(self, frame: StatusFrame) -> None:
+        frequency, target, deadline = self.tuneInProgress
+        if not frame.moving and frame.position == target:
+            self.tuneInProgress = None
+            self.statusBar.SetStatusText(f"Tuned to {frequency} MHz, filter at {frame.frequency} MHz")
+        elif time.monotonic() > deadline:
+            self.tuneInProgress = None
+            self.statusBar.SetStatusText(
+                f"Tuning to {frequency} MHz failed: stepper at {frame.position} instead of {target} "
+                f"after {TUNE_SETTLE_TIMEOUT:g} s"
+            )
 
     def OnFilterOffsetMessageReceived(self, message: str) -> None:
-        try:
-            match int(message):
-                case -10:
-                    self.serialCommander.filter_step_down_10()
-                case -1:
-                    self.serialCommander.filter_step_down_1()
-                case 1:
-                    self.serialCommander.filter_step_up_1()
-                case 10:
-                    self.serialCommander.filter_step_up_10()
-        except SerialException:
-            logging.error(ERROR_MESSAGE)
-            wx.MessageBox(ERROR_MESSAGE, "Error", wx.OK | wx.ICON_ERROR)
+        match int(message):
+            case -10:
+                self.SubmitCommand("filter_step_down_10")
+            case -1:
+                self.SubmitCommand("filter_step_down_1")
+            case 1:
+                self.SubmitCommand("filter_step_up_1")
+            case 10:
+                self.SubmitCommand("filter_step_up_10")
 
     def OnTimerTick(self, event):
-        try:
-            statusMessage = self.serialCommander.get_status()
-            statusMessageList = statusMessage.split(",")
-            # Read current frequency
-            newFrequency: str = statusMessageList[1]
-            if newFrequency.isnumeric():
-                self.frequencyPanel.frequencyStaticText.SetLabel(f"{newFrequency} MHz")
-            # Read bypass status
-            if statusMessageList[3] == "0":
-                self.controllsPanel.bypassToggleButton.SetValue(False)
-            else:
-                self.controllsPanel.bypassToggleButton.SetValue(True)
-            # Read TX Mode status
-            if statusMessageList[5] == "0":
-                self.controllsPanel.txModeToggleButton.SetValue(False)
-            else:
-                self.controllsPanel.txModeToggleButton.SetValue(True)
-        except SerialException as se:
-            logging.error("Could not find or configure the device: %s", se)
-            wx.MessageBox("Could not find or configure the device", "Error", wx.OK | wx.ICON_ERROR)
-            logging.debug("Stopping the update status timer...")
+        self.RequestStatus()
+
+    def OnStatusReceived(self, message: StatusFrame, worker: SerialWorker) -> None:
+        if worker is not self.serialWorker:
+            # late reply of a worker that was already stopped or replaced
+            return
+        self.statusRequestPending = False
+        if not self.connected:
+            self.connected = True
+            if self.connectionSupervisor is not None:
+                self.connectionSupervisor.connection_established()
+            logger.debug(f"Using serial port: {self.serialWorker.port}")
+            self.statusBar.SetStatusText(f"Using serial port: {self.serialWorker.port}")
+        self.pollScheduler.status_received(message)
+        self.ScheduleNextPoll()
+        self.statusViewModel.Update(message)
+        self.historyPanel.Append(message)
+        if self.tuneInProgress is not None:
+            self.CheckTuneProgress(message)
+
+    def OnSerialError(self, message: Exception, worker: SerialWorker) -> None:
+        if worker is not self.serialWorker:
+            # error of a worker that was already stopped or replaced, e.g. the old port failing after a reconnect
+            return
+        self.statusRequestPending = False
+        if isinstance(message, BadSerialResponseException):
+            # a missing or garbled reply, keep polling with exponential back-off
+            self.pollScheduler.poll_failed()
+            interval = self.pollScheduler.next_interval()
+            self.statusBar.SetStatusText(f"{message}, retrying in {interval:.1f} s")
+            self.ScheduleNextPoll()
+            return
+        logger.error("Could not find or configure the device: %s", message)
+        logger.debug("Stopping the update status timer...")
+        self.updateStatusTimer.Stop()
+        self.StopSerialWorker()
+        # no modal dialog, the supervisor reopens the port as soon as the device is usable again
+        self.statusBar.SetStatusText(f"Connection lost ({message}), waiting for the device...")
+        if self.connectionSupervisor is not None:
+            self.connectionSupervisor.connection_lost()
+
+    def OnConnectionStateChanged(self, state: ConnectionState, port: str) -> None:
+        if self.connectionSupervisor is None:
+            # late notification of a supervisor that was already stopped
+            return
+        if state is ConnectionState.DISCONNECTED:
             self.updateStatusTimer.Stop()
-        except BadSerialResponseException as bsre:
-            wx.MessageBox(f"{bsre}", "Error", wx.OK | wx.ICON_ERROR)
+            self.StopSerialWorker()
+            self.statusBar.SetStatusText(f"{port} disconnected, waiting for it to come back...")
+        elif state is ConnectionState.CONNECTING:
+            self.serialMetrics.reconnects += 1
+            self.StartSerialWorker(port, replay=self.connectionSupervisor.replay_operations())
 
 
 class ControllsPanel(wx.Panel):
-    def __init__(self, parent) -> None:
+    def __init__(self, parent, topicPrefix: str = "") -> None:
         wx.Panel.__init__(
             self, parent, wx.ID_ANY, wx.DefaultPosition, wx.DefaultSize, wx.TAB_TRAVERSAL, "ControllsPanel"
         )
+        # prefix of the pubsub topics, lets several panels drive different devices
+        self.topicPrefix = topicPrefix
         mainSizer = wx.BoxSizer(wx.VERTICAL)
 
         sizer = wx.StaticBoxSizer(wx.StaticBox(self, -1, "Filter"), wx.VERTICAL)
@@ -190,55 +431,85 @@ class ControllsPanel(wx.Panel):
 
     def OnBypassToggled(self, event) -> None:
         value = event.GetEventObject().GetValue()
-        pub.sendMessage("bypass", message=value)
+        pub.sendMessage(f"{self.topicPrefix}bypass", message=value)
         if value:
-            logging.debug("BYPASS ON")
+            logger.debug("BYPASS ON")
         else:
-            logging.debug("BYPASS OFF")
+            logger.debug("BYPASS OFF")
 
     def OnOffsetButtonClicked(self, event) -> None:
         label = event.GetEventObject().GetLabel()
-        pub.sendMessage("filter_offset", message=label)
-        logging.debug("FILTER OFFSET %s", label)
+        pub.sendMessage(f"{self.topicPrefix}filter_offset", message=label)
+        logger.debug("FILTER OFFSET %s", label)
 
     def OnResetFilterClicked(self, event) -> None:
-        pub.sendMessage("reset_filter", message="reset")
-        logging.debug("%s clicked", event.GetEventObject().GetLabel())
+        pub.sendMessage(f"{self.topicPrefix}reset_filter", message="reset")
+        logger.debug("%s clicked", event.GetEventObject().GetLabel())
 
     def OnTXModeToggled(self, event) -> None:
         value = event.GetEventObject().GetValue()
-        pub.sendMessage("force_tx", message=value)
+        pub.sendMessage(f"{self.topicPrefix}force_tx", message=value)
         if value:
-            logging.debug("FORCE TX MODE ON")
+            logger.debug("FORCE TX MODE ON")
         else:
-            logging.debug("FORCE TX MODE OFF")
+            logger.debug("FORCE TX MODE OFF")
 
 
 class FrequencyPanel(wx.Panel):
-    def __init__(self, parent) -> None:
+    """Frequency display, with ``tunable`` also the TUNE controls publishing ``{topicPrefix}tune_to``.
+
+    Only owners handling that topic pass ``tunable``, otherwise the button would do nothing.
+    """
+
+    def __init__(self, parent, topicPrefix: str = "", tunable: bool = False) -> None:
         wx.Panel.__init__(
             self, parent, wx.ID_ANY, wx.DefaultPosition, wx.DefaultSize, wx.TAB_TRAVERSAL, "FrequencyPanel"
         )
+        self.topicPrefix = topicPrefix
         sizer = wx.StaticBoxSizer(wx.StaticBox(self, -1, "Frequency"), wx.VERTICAL)
         frequencyFont = wx.Font(48, wx.FONTFAMILY_DEFAULT, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_BOLD, False)
         self.frequencyStaticText = wx.StaticText(self, wx.ID_ANY, "433.500 MHz", style=wx.ALIGN_CENTER_HORIZONTAL)
         self.frequencyStaticText.SetFont(frequencyFont)
         sizer.Add(self.frequencyStaticText, 0, wx.ALIGN_CENTER)
 
+        if tunable:
+            tuneSizer = wx.BoxSizer(wx.HORIZONTAL)
+            self.tuneFrequencyCtrl = wx.SpinCtrlDouble(self, min=0, max=10000, initial=433.5, inc=0.5)
+            self.tuneFrequencyCtrl.SetDigits(1)
+            tuneSizer.Add(self.tuneFrequencyCtrl, 1, wx.EXPAND | wx.ALL)
+            tuneSizer.Add(wx.StaticText(self, label="MHz"), 0, wx.ALIGN_CENTER_VERTICAL | wx.LEFT | wx.RIGHT, 5)
+            tuneButton = wx.Button(self, label="TUNE")
+            tuneButton.Bind(wx.EVT_BUTTON, self.OnTuneClicked)
+            tuneSizer.Add(tuneButton, 0, wx.EXPAND | wx.ALL)
+            sizer.Add(tuneSizer, 0, wx.EXPAND | wx.TOP, 5)
+
         self.SetSizer(sizer)
         self.SetAutoLayout(1)
         sizer.Fit(self)
 
+    def OnTuneClicked(self, event) -> None:
+        frequency = self.tuneFrequencyCtrl.GetValue()
+        pub.sendMessage(f"{self.topicPrefix}tune_to", message=frequency)
+        logger.debug("TUNE TO %s MHz", frequency)
+
 
 class GSToggleButton(wx.ToggleButton):
     def __init__(self, parent, label=""):
         wx.ToggleButton.__init__(self, parent, wx.ID_ANY, label)
         self.Bind(wx.EVT_TOGGLEBUTTON, self.OnButtonToggled, self)
 
-    def OnButtonToggled(self, event):
-        if event.GetEventObject().GetValue():
+    def SetValue(self, state: bool) -> None:
+        # programmatic changes do not emit EVT_TOGGLEBUTTON, keep the colour in sync here
+        wx.ToggleButton.SetValue(self, state)
+        self.UpdateColour()
+
+    def UpdateColour(self) -> None:
+        if self.GetValue():
             self.SetBackgroundColour(wx.BLUE)
         else:
             self.SetBackgroundColour(wx.Colour(38, 38, 38))
+
+    def OnButtonToggled(self, event):
+        self.UpdateColour()
         # let other handlers process this event
         event.Skip()
@@ -0,0 +1,143 @@
+import bisect
+import math
+from array import array
+
+BYPASS_FLAG = 1
+TX_MODE_FLAG = 2
+
+
+class _Ring:
+    """Preallocated ring of (time, minimum, maximum, flags) entries, the oldest entry is overwritten when full."""
+
+    __slots__ = ("times", "minimums", "maximums", "flags", "capacity", "count", "next")
+
+    def __init__(self, capacity: int) -> None:
+        self.times = array("d", bytes(8 * capacity))
+        self.minimums = array("d", bytes(8 * capacity))
+        self.maximums = array("d", bytes(8 * capacity))
+        self.flags = array("B", bytes(capacity))
+        self.capacity = capacity
+        self.count = 0
+        self.next = 0
+
+    def append(self, time: float, minimum: float, maximum: float, flags: int) -> None:
+        i = self.next
+        self.times[i] = time
+        self.minimums[i] = minimum
+        self.maximums[i] = maximum
+        self.flags[i] = flags
+        self.next = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def index(self, position: int) -> int:
+        """Buffer index of the entry at the given position, 0 being the oldest."""
+        return (self.next - self.count + position) % self.capacity
+
+    def first_at_or_after(self, time: float) -> int:
+        """Position of the first entry not older than ``time``, ``count`` if there is none."""
+        return bisect.bisect_left(range(self.count), time, key=lambda position: self.times[self.index(position)])
+
+
+class StatusHistory:
+    """Frequency and mode history of a session in fixed memory.
+
+    Level 0 holds the last ``capacity`` samples, every further level holds min/max aggregates of ``factor``
+    entries of the level below, so with the defaults the levels cover 8192 samples (about 14 min at 10 Hz),
+    then 8 times as much per level up to about 5 days. All arrays are allocated up front (25 bytes per entry,
+    about 800 KB with the defaults), ``append`` costs the same after a minute or after a week.
+
+    ``columns`` picks the finest level whose visible entries still fit in a few times the requested number
+    of columns, so drawing a window of hours reads about as many entries as drawing a few seconds.
+    """
+
+    def __init__(self, capacity: int = 8192, levels: int = 4, factor: int = 8) -> None:
+        self._levels = [_Ring(capacity) for _ in range(levels)]
+        self._factor = factor
+        # per level: [last time, minimum, maximum, flags, entries] not yet aggregated into the next level
+        self._pending = [[0.0, math.inf, -math.inf, 0, 0] for _ in range(levels - 1)]
+
+    def __len__(self) -> int:
+        return self._levels[0].count
+
+    @property
+    def latest_time(self) -> float | None:
+        level = self._levels[0]
+        return level.times[level.index(level.count - 1)] if level.count else None
+
+    def append(self, time: float, frequency: int | None, bypass: bool, tx_mode: bool) -> None:
+        """Add a sample, ``time`` must not decrease between calls."""
+        value = math.nan if frequency is None else float(frequency)
+        minimum, maximum = value, value
+        flags = (BYPASS_FLAG if bypass else 0) | (TX_MODE_FLAG if tx_mode else 0)
+        self._levels[0].append(time, minimum, maximum, flags)
+        for level, pending in enumerate(self._pending, 1):
+            pending[0] = time
+            # NaN compares false, unknown frequencies are left out of the range
+            if minimum < pending[1]:
+                pending[1] = minimum
+            if maximum > pending[2]:
+                pending[2] = maximum
+            pending[3] |= flags
+            pending[4] += 1
+            if pending[4] < self._factor:
+                break
+            _, minimum, maximum, flags, _ = pending
+            if minimum > maximum:
+                minimum = maximum = math.nan
+            self._levels[level].append(time, minimum, maximum, flags)
+            pending[1:] = [math.inf, -math.inf, 0, 0]
+
+    def _choose_level(self, start: float, limit: int) -> tuple[int, int]:
+        """Return the level to read for a window starting at ``start`` and the position of its first entry."""
+        chosen = (0, self._levels[0].first_at_or_after(start))
+        for number, level in enumerate(self._levels):
+            if level.count == 0:
+                break
+            first = level.first_at_or_after(start)
+            chosen = (number, first)
+            complete = level.count < level.capacity or level.times[level.index(0)] <= start
+            if complete and level.count - first <= limit:
+                break
+        return chosen
+
+    def columns(self, start: float, end: float, width: int) -> tuple[list[float], list[float], list[int]]:
+        """Decimate the window ``start``..``end`` to ``width`` columns.
+
+        Returns:
+            tuple[list[float], list[float], list[int]]: minimum and maximum frequency (NaN for columns
+            without data) and the OR of the mode flags of every column.
+        """
+        minimums = [math.nan] * width
+        maximums = [math.nan] * width
+        flags = [0] * width
+        if width <= 0 or end <= start or not len(self):
+            return minimums, maximums, flags
+        number, first = self._choose_level(start, 4 * width)
+        level = self._levels[number]
+        scale = width / (end - start)
+        entries = [
+            (level.times[i], level.minimums[i], level.maximums[i], level.flags[i])
+            for i in map(level.index, range(first, level.count))
+        ]
+        # the newest samples are only in the aggregates pending below the chosen level
+        tail = [math.inf, -math.inf, 0, 0]
+        for _, minimum, maximum, entry_flags, count in self._pending[:number]:
+            if count:
+                tail[0], tail[1] = min(tail[0], minimum), max(tail[1], maximum)
+                tail[2] |= entry_flags
+                tail[3] += count
+        if tail[3] and tail[0] <= tail[1]:
+            entries.append((self.latest_time, tail[0], tail[1], tail[2]))
+        for time, minimum, maximum, entry_flags in entries:
+            if time < start or time > end:
+                continue
+            column = min(int((time - start) * scale), width - 1)
+            flags[column] |= entry_flags
+            if minimum != minimum:
+                continue
+            if not minimums[column] <= minimum:
+                minimums[column] = minimum
+            if not maximums[column] >= maximum:
+                maximums[column] = maximum
+        return minimums, maximums, flags
@@ -0,0 +1,88 @@
+import logging
+from typing import NamedTuple
+
+from serial_comm import StatusFrame
+
+logger = logging.getLogger(__name__)
+
+
+class ViewState(NamedTuple):
+    """What the controller widgets currently show."""
+
+    frequency_label: str | None
+    bypass: bool | None
+    tx_mode: bool | None
+
+    @classmethod
+    def from_frame(cls, frame: StatusFrame) -> "ViewState":
+        frequency_label = f"{frame.frequency} MHz" if frame.frequency is not None else None
+        return cls(frequency_label, frame.bypass, frame.tx_mode)
+
+
+EMPTY_STATE = ViewState(None, None, None)
+
+
+def diff_states(old: ViewState, new: ViewState) -> dict[str, object]:
+    """Return the fields of ``new`` that differ from ``old``.
+
+    A ``None`` field of ``new`` means the value is unknown and never counts as a change,
+    so the widget keeps showing the last known value.
+    """
+    return {
+        field: value
+        for field, old_value, value in zip(ViewState._fields, old, new)
+        if value is not None and value != old_value
+    }
+
+
+class StatusViewModel:
+    """Renders status frames to a ``ControllsPanel`` and a ``FrequencyPanel``.
+
+    The last rendered state is remembered and only widgets whose value changed are touched,
+    a status tick with an unchanged frame costs no widget calls at all.
+    """
+
+    def __init__(self, controllsPanel, frequencyPanel) -> None:
+        self.controllsPanel = controllsPanel
+        self.frequencyPanel = frequencyPanel
+        self.rendered = EMPTY_STATE
+        self.renders = 0
+
+    def Update(self, frame: StatusFrame) -> dict[str, object]:
+        """Apply ``frame`` to the widgets and return the fields that were changed."""
+        changes = diff_states(self.rendered, ViewState.from_frame(frame))
+        if changes:
+            self.Render(changes)
+            self.rendered = self.rendered._replace(**changes)
+            self.renders += 1
+        return changes
+
+    def WidgetChanged(self, field: str, value: object) -> None:
+        """Record a value the user set directly on a widget.
+
+        Without this a status frame still holding the old value would look unchanged
+        and the widget would never be put back when the device rejects the change.
+        """
+        self.rendered = self.rendered._replace(**{field: value})
+
+    def Invalidate(self) -> None:
+        """Forget the rendered state, the next frame redraws every widget."""
+        self.rendered = EMPTY_STATE
+
+    def Render(self, changes: dict[str, object]) -> None:
+        logger.debug("Rendering changes: %s", changes)
+        # freeze both panels so all changes are painted in a single pass
+        self.controllsPanel.Freeze()
+        self.frequencyPanel.Freeze()
+        try:
+            if "frequency_label" in changes:
+                self.frequencyPanel.frequencyStaticText.SetLabel(changes["frequency_label"])
+                # a wider or narrower label needs a new layout of its own panel only
+                self.frequencyPanel.Layout()
+            if "bypass" in changes:
+                self.controllsPanel.bypassToggleButton.SetValue(changes["bypass"])
+            if "tx_mode" in changes:
+                self.controllsPanel.txModeToggleButton.SetValue(changes["tx_mode"])
+        finally:
+            self.frequencyPanel.Thaw()
+            self.controllsPanel.Thaw()